@@ -9,36 +9,204 @@ Command-line interface for the conversational RAG system with chat history suppo
 import os
 import sys
 import json
+import time
+import itertools
 import click
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional
 
-# Rich for beautiful output
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.markdown import Markdown
-from rich.syntax import Syntax
+# orjson decodes large session files much faster; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# Import our conversational RAG system
-from conversational_rag import ConversationalRAGSystem
+# Rich for beautiful output (other Rich components and the RAG system are
+# imported inside the commands that need them to keep CLI start-up fast)
+from rich.console import Console
 
 console = Console()
 
+# Per-user daemon socket (not in /tmp, where other users could claim it)
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "langgraph_adv"),
+    "convrag.sock"
+)
+
+MODELS_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "langgraph_adv", "ollama_models.json")
+MODELS_CACHE_TTL = 60  # seconds
+
+# Emoji and color used when displaying each message role
+ROLE_STYLES = {
+    "user": ("👤", "blue"),
+    "assistant": ("🤖", "green"),
+}
+
+DEFAULT_EMBEDDING_MODEL = "bge-m3"
+FALLBACK_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# The default model is an Ollama tag; backends that load HuggingFace models
+# use these instead when -e is not given. MiniLM (not BAAI/bge-m3, a 2.2 GB
+# model) keeps the first ONNX export and quantization quick; pass -e for a
+# larger model
+HF_BACKEND_DEFAULT_MODELS = {
+    "huggingface": FALLBACK_EMBEDDING_MODEL,
+    "onnx-int8": FALLBACK_EMBEDDING_MODEL,
+    "model2vec": "minishlab/potion-base-8M",
+}
+
+# Options shared by several commands, built once at import time
+system_info_option = click.option('--system-info', default='conversational_rag_system.json', help='System info file')
+sessions_file_option = click.option('--sessions-file', default='conversational_sessions.json', help='Sessions file')
+sessions_db_option = click.option('--sessions-db', default='conversational_sessions.db',
+                                  help="SQLite sessions database, migrated from --sessions-file on first use "
+                                       "(pass '' to use the JSON sessions file instead)")
+embedding_override_option = click.option('--embedding-model', '-e', default=None,
+                                         help='Embedding model (defaults to the one used at build time)')
+source_option = click.option('--source', 'sources', multiple=True,
+                              help='Only search documents from this source URL (repeatable)')
+semantic_cache_option = click.option('--semantic-cache', is_flag=True,
+                                     help='Answer near-identical repeated questions from a cache')
+
+def resolve_embedding_model(name: str, quant: Optional[str] = None) -> str:
+    """Append an Ollama quantization tag suffix to an embedding model name"""
+    if not quant or '/' in name:
+        # HuggingFace models have no Ollama quantization tags
+        return name
+    return f"{name}-{quant}" if ':' in name else f"{name}:{quant}"
+
+# Existence checks are only needed once per CLI invocation
+_exists_cache = {}
+
+def path_exists(path: str) -> bool:
+    """Check whether a path exists, stat-ing each path at most once per run"""
+    if path not in _exists_cache:
+        _exists_cache[path] = os.path.exists(path)
+    return _exists_cache[path]
+
+def print_error(message: str):
+    """Print an error in red on a terminal, or as plain text on stderr for scripts"""
+    if console.is_terminal:
+        console.print(f"[red]{message}[/red]")
+    else:
+        click.echo(message, err=True)
+
+def open_sessions(system, sessions_file: str, sessions_db: Optional[str]) -> bool:
+    """Load sessions from the SQLite database if given, otherwise from the JSON file"""
+    if sessions_db:
+        system.use_session_store(sessions_db, legacy_json=sessions_file)
+        return True
+    if path_exists(sessions_file):
+        system.load_sessions(sessions_file)
+        return True
+    return False
+
+def persist_sessions(system, sessions_file: str):
+    """Save sessions to the JSON file unless they are already written through to SQLite"""
+    if system.session_store is None:
+        system.save_sessions(sessions_file)
+
+def read_json_file(filepath: str) -> Any:
+    """Parse a JSON file, using orjson when it is installed"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
 def load_system_info(filepath: str = "conversational_rag_system.json") -> dict:
     """Load system information from file"""
     try:
-        if os.path.exists(filepath):
-            with open(filepath, 'r') as f:
-                return json.load(f)
+        if path_exists(filepath):
+            return read_json_file(filepath)
         return {}
     except Exception as e:
-        console.print(f"[red]Error loading system info: {e}[/red]")
+        print_error(f"Error loading system info: {e}")
         return {}
 
+def read_models_cache(cache_path: str = MODELS_CACHE_PATH, ttl: int = MODELS_CACHE_TTL) -> Optional[str]:
+    """Return cached 'ollama list' output if it is younger than ttl seconds"""
+    try:
+        if os.path.getmtime(cache_path) < time.time() - ttl:
+            return None
+        return read_json_file(cache_path)['stdout']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def write_models_cache(stdout: str, cache_path: str = MODELS_CACHE_PATH):
+    """Atomically store 'ollama list' output in the cache file"""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"timestamp": time.time(), "stdout": stdout}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        console.print(f"[dim]Could not cache model list: {e}[/dim]")
+
+def run_with_spinner(description: str, func, *args, **kwargs):
+    """Run func under a Rich spinner, skipping the spinner when output is not a terminal"""
+    if not console.is_terminal:
+        return func(*args, **kwargs)
+    
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console
+    ) as progress:
+        progress.add_task(description, total=None)
+        return func(*args, **kwargs)
+
+def daemon_files(system_info: str, sessions_file: str, sessions_db: str) -> dict:
+    """Absolute paths of the files a daemon was (or a query would be) started with"""
+    return {
+        "system_info": os.path.abspath(system_info),
+        "sessions_file": os.path.abspath(sessions_file),
+        "sessions_db": os.path.abspath(sessions_db) if sessions_db else ""
+    }
+
+def query_daemon(socket_path: str, question: str, session: Optional[str], files: dict) -> Optional[dict]:
+    """
+    Send a question to a running 'daemon' process over its Unix socket
+    
+    The daemon refuses questions sent with different files (see daemon_files)
+    than it was started with. Returns the response dictionary, or None if no
+    daemon is reachable.
+    """
+    if not path_exists(socket_path):
+        return None
+    
+    import socket
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            request = {"op": "query", "question": question, "session": session, "files": files}
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                response = json.loads(reader.readline())
+    except (OSError, ValueError):
+        return None
+    
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response
+
+def socket_in_use(socket_path: str) -> bool:
+    """Check whether a process is accepting connections on a Unix socket (False for a stale socket file)"""
+    import socket
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
 def display_system_info(info: dict):
     """Display system information in a table"""
+    from rich.table import Table
+    
     table = Table(title="Conversational RAG System Information")
     table.add_column("Property", style="cyan")
     table.add_column("Value", style="green")
@@ -59,22 +227,25 @@ def display_conversation_history(messages: List, max_messages: int = 10):
     # Show only the last N messages
     recent_messages = messages[-max_messages:] if len(messages) > max_messages else messages
     
-    for i, message in enumerate(recent_messages):
-        role_emoji = "👤" if message.role == "user" else "🤖"
-        role_color = "blue" if message.role == "user" else "green"
+    # Collect all lines and print them in one call (one lock acquire, one flush)
+    lines = []
+    for message in recent_messages:
+        role_emoji, role_color = ROLE_STYLES.get(message.role, ROLE_STYLES["assistant"])
         
-        # Format timestamp
-        timestamp = message.timestamp.strftime("%H:%M:%S")
+        # Format timestamp (plain int formatting is cheaper than strftime)
+        t = message.timestamp
+        timestamp = f"{t.hour:02d}:{t.minute:02d}:{t.second:02d}"
         
         # Truncate long messages
-        content = message.content
-        if len(content) > 200:
-            content = content[:200] + "..."
+        c = message.content
+        content = c if len(c) <= 200 else c[:200] + "..."
         
-        console.print(f"[{role_color}]{role_emoji} {timestamp}[/{role_color}] {content}")
+        lines.append(f"[{role_color}]{role_emoji} {timestamp}[/{role_color}] {content}")
     
     if len(messages) > max_messages:
-        console.print(f"[dim]... and {len(messages) - max_messages} more messages[/dim]")
+        lines.append(f"[dim]... and {len(messages) - max_messages} more messages[/dim]")
+    
+    console.print("\n".join(lines))
 
 @click.group()
 @click.version_option(version="1.0.0")
@@ -96,21 +267,40 @@ def cli():
         
         # Check system status
         python conversational_cli.py status
+        
+        # Keep the system loaded so 'query' calls start instantly
+        python conversational_cli.py daemon
     """
     pass
 
 @cli.command()
 @click.option('--urls', '-u', multiple=True, help='URLs to fetch content from')
 @click.option('--file', '-f', help='File containing URLs (one per line)')
-@click.option('--model', '-m', default=None, help='Ollama model to use')
+@click.option('--model', '-m', default=None, help='Ollama model to use (HuggingFace model id for vllm)')
+@click.option('--llm-backend', type=click.Choice(['ollama', 'vllm', 'tgi']), default='ollama',
+              help='LLM serving backend (vllm/tgi batch concurrent requests)')
+@click.option('--llm-url', default=None, help='Text Generation Inference server URL (tgi backend)')
 @click.option('--output', '-o', default='conversational_rag_system.json', help='Output file for system info')
 @click.option('--chunk-size', default=1000, help='Document chunk size')
-@click.option('--chunk-overlap', default=200, help='Document chunk overlap')
-def build(urls: tuple, file: str, model: str, output: str, chunk_size: int, chunk_overlap: int):
+@click.option('--chunk-overlap', default=100, help='Document chunk overlap (5-10% of chunk size works well)')
+@click.option('--chunk-strategy', type=click.Choice(['fixed', 'recursive', 'sentence', 'token']), default='recursive',
+              help="How documents are split into chunks ('token' measures chunk size in tokens)")
+@click.option('--embedding-model', '-e', default=None,
+              help=f'Embedding model (Ollama tag or HuggingFace repo id; default {DEFAULT_EMBEDDING_MODEL} via Ollama)')
+@click.option('--embedding-backend', type=click.Choice(['auto', 'huggingface', 'onnx-int8', 'ollama', 'model2vec']), default='auto',
+              help="Embedding backend ('auto' picks HuggingFace or Ollama from the model name)")
+@click.option('--embedding-quant', type=click.Choice(['bf16', 'q8_0', 'q4_0']), default=None,
+              help='Ollama quantization tag appended to the embedding model')
+@click.option('--embed-batch-size', default=32, help='Chunks per embedding request (Ollama embedding models)')
+@click.option('--prefetch-workers', default=16, help='Number of URLs fetched concurrently')
+@click.option('--url-batch-size', default=64, help='Number of URLs fetched and indexed per batch')
+def build(urls: tuple, file: str, model: str, llm_backend: str, llm_url: str, output: str, chunk_size: int, chunk_overlap: int, chunk_strategy: str,
+          embedding_model: str, embedding_backend: str, embedding_quant: str, embed_batch_size: int, prefetch_workers: int,
+          url_batch_size: int):
     """Build a conversational RAG system from URLs"""
     
     if not urls and not file:
-        console.print("[red]Error: No URLs provided. Use -u or -f option.[/red]")
+        print_error("Error: No URLs provided. Use -u or -f option.")
         sys.exit(1)
     
     # Collect URLs
@@ -118,19 +308,30 @@ def build(urls: tuple, file: str, model: str, output: str, chunk_size: int, chun
     if file:
         try:
             with open(file, 'r') as f:
-                file_urls = [line.strip() for line in f if line.strip()]
-                url_list.extend(file_urls)
+                # Strip each line once and skip blank lines
+                url_list.extend(filter(None, map(str.strip, f)))
         except Exception as e:
-            console.print(f"[red]Error reading URL file: {e}[/red]")
+            print_error(f"Error reading URL file: {e}")
             sys.exit(1)
     
     if not url_list:
-        console.print("[red]Error: No valid URLs found[/red]")
+        print_error("Error: No valid URLs found")
         sys.exit(1)
     
+    if embedding_model is None:
+        embedding_model = HF_BACKEND_DEFAULT_MODELS.get(embedding_backend, DEFAULT_EMBEDDING_MODEL)
+    elif embedding_backend in HF_BACKEND_DEFAULT_MODELS:
+        if '/' not in embedding_model and not os.path.isdir(embedding_model):
+            print_error(f"Error: --embedding-backend {embedding_backend} needs a HuggingFace model id "
+                        f"(e.g. {HF_BACKEND_DEFAULT_MODELS[embedding_backend]}), not '{embedding_model}'")
+            sys.exit(1)
+    
     console.print(f"[blue]Building conversational RAG system from {len(url_list)} URLs...[/blue]")
     
     try:
+        from conversational_rag import ConversationalRAGSystem, batched
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+        
         # Initialize system
         with Progress(
             SpinnerColumn(),
@@ -142,16 +343,27 @@ def build(urls: tuple, file: str, model: str, output: str, chunk_size: int, chun
             # Create system with custom parameters
             system = ConversationalRAGSystem(
                 model_name=model or "llama3.1:8b-instruct-q8_0",
+                llm_backend=llm_backend,
+                llm_url=llm_url,
+                embedding_model=resolve_embedding_model(embedding_model, embedding_quant),
+                embedding_backend=embedding_backend,
                 chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap
+                chunk_overlap=chunk_overlap,
+                chunk_strategy=chunk_strategy,
+                embed_batch_size=embed_batch_size,
+                fetch_workers=prefetch_workers
             )
             
-            progress.update(task, description="Building RAG system from URLs...")
-            
-            # Build the system
-            system_info = system.build_rag_from_urls(url_list, output)
+            # Build the system batch by batch to keep memory bounded
+            done = 0
+            for batch in batched(url_list, url_batch_size):
+                progress.update(task, description=f"Indexing URLs {done + 1}-{done + len(batch)} of {len(url_list)}...")
+                system.add_urls_batch(batch)
+                done += len(batch)
             
             progress.update(task, description="Saving system info...")
+            system_info = system.finalize(output)
+            system.close()
         
         console.print(f"[green]✓ Conversational RAG system built successfully![/green]")
         console.print(f"System info saved to: {output}")
@@ -160,35 +372,46 @@ def build(urls: tuple, file: str, model: str, output: str, chunk_size: int, chun
         display_system_info(system_info)
         
     except Exception as e:
-        console.print(f"[red]Error building conversational RAG system: {e}[/red]")
+        print_error(f"Error building conversational RAG system: {e}")
         sys.exit(1)
 
 @cli.command()
 @click.option('--session', '-s', help='Session ID to use (auto-created if not provided)')
-@click.option('--system-info', default='conversational_rag_system.json', help='System info file')
-@click.option('--sessions-file', default='conversational_sessions.json', help='Sessions file')
+@system_info_option
+@sessions_file_option
+@sessions_db_option
 @click.option('--show-history', is_flag=True, help='Show conversation history at start')
-def chat(session: str, system_info: str, sessions_file: str, show_history: bool):
+@embedding_override_option
+@semantic_cache_option
+@source_option
+def chat(session: str, system_info: str, sessions_file: str, sessions_db: str, show_history: bool, embedding_model: str,
+         semantic_cache: bool, sources: tuple):
     """Start an interactive chat session"""
     
     try:
+        from conversational_rag import ConversationalRAGSystem
+        
         # Load system info
         info = load_system_info(system_info)
         if not info:
-            console.print("[red]Error: No system info found. Run 'build' command first.[/red]")
+            print_error("Error: No system info found. Run 'build' command first.")
             sys.exit(1)
         
         # Initialize system
         console.print("[blue]Initializing conversational RAG system...[/blue]")
         system = ConversationalRAGSystem(
             model_name=info.get('model', 'llama3.1:8b-instruct-q8_0'),
-            vector_store_path=info.get('vector_store_path', './conversational_chroma_db')
+            embedding_model=embedding_model or info.get('embedding_model', FALLBACK_EMBEDDING_MODEL),
+            embedding_backend=info.get('embedding_backend', 'auto'),
+            llm_backend=info.get('llm_backend', 'ollama'),
+            llm_url=info.get('llm_url'),
+            vector_store_path=info.get('vector_store_path', './conversational_chroma_db'),
+            semantic_cache=semantic_cache
         )
         
         # Load existing sessions if available
-        if os.path.exists(sessions_file):
-            system.load_sessions(sessions_file)
-            console.print(f"[green]Loaded existing sessions from {sessions_file}[/green]")
+        if open_sessions(system, sessions_file, sessions_db):
+            console.print(f"[green]Loaded existing sessions from {sessions_db or sessions_file}[/green]")
         
         # Create or get session
         if session:
@@ -201,6 +424,11 @@ def chat(session: str, system_info: str, sessions_file: str, show_history: bool)
             session = system.create_session()
             console.print(f"[green]Created new session: {session}[/green]")
         
+        # Scope the session to the given sources (kept with the session)
+        if sources:
+            system.set_session_sources(session, list(sources))
+            console.print(f"[green]Searching only: {', '.join(sources)}[/green]")
+        
         # Show conversation history if requested
         if show_history:
             messages = system.get_conversation_history(session)
@@ -231,8 +459,8 @@ def chat(session: str, system_info: str, sessions_file: str, show_history: bool)
                     console.print(f"[blue]Available sessions: {', '.join(sessions)}[/blue]")
                     continue
                 elif question.lower() == 'save':
-                    system.save_sessions(sessions_file)
-                    console.print(f"[green]Sessions saved to {sessions_file}[/green]")
+                    persist_sessions(system, sessions_file)
+                    console.print(f"[green]Sessions saved to {sessions_db or sessions_file}[/green]")
                     continue
                 elif question.lower() == 'help':
                     console.print("[blue]Available commands:[/blue]")
@@ -243,20 +471,13 @@ def chat(session: str, system_info: str, sessions_file: str, show_history: bool)
                     console.print("  quit     - Exit chat mode")
                     continue
                 
-                # Process the question
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=console
-                ) as progress:
-                    task = progress.add_task("Processing question...", total=None)
-                    
-                    response = system.query(question, session)
-                    
-                    progress.update(task, description="Generating response...")
-                
-                # Display answer
-                console.print(f"\n[green]Answer:[/green] {response['answer']}")
+                # Stream the answer as it is generated
+                console.print("\n[green]Answer:[/green] ", end="")
+                response = system.query(
+                    question, session,
+                    on_token=lambda token: console.print(token, end="", markup=False, highlight=False)
+                )
+                console.print()
                 
                 # Display metrics
                 console.print(f"\n[dim]Query time: {response['query_time']:.2f}s[/dim]")
@@ -268,97 +489,224 @@ def chat(session: str, system_info: str, sessions_file: str, show_history: bool)
                 console.print("\n[yellow]Interrupted by user[/yellow]")
                 break
             except Exception as e:
-                console.print(f"[red]Error processing question: {e}[/red]")
+                print_error(f"Error processing question: {e}")
         
         # Save sessions before exiting
-        system.save_sessions(sessions_file)
-        console.print(f"\n[green]Sessions saved to {sessions_file}[/green]")
+        persist_sessions(system, sessions_file)
+        console.print(f"\n[green]Sessions saved to {sessions_db or sessions_file}[/green]")
         console.print("[blue]Goodbye![/blue]")
         
     except Exception as e:
-        console.print(f"[red]Error in chat mode: {e}[/red]")
+        print_error(f"Error in chat mode: {e}")
         sys.exit(1)
 
 @cli.command()
 @click.option('--session', '-s', help='Session ID to query')
 @click.option('--question', '-q', prompt='Enter your question', help='Question to ask')
-@click.option('--system-info', default='conversational_rag_system.json', help='System info file')
-@click.option('--sessions-file', default='conversational_sessions.json', help='Sessions file')
-def query(session: str, question: str, system_info: str, sessions_file: str):
+@system_info_option
+@sessions_file_option
+@sessions_db_option
+@embedding_override_option
+@click.option('--socket', 'socket_path', is_flag=False, flag_value=DEFAULT_SOCKET_PATH, default=None,
+              help=f'Ask a running daemon instead of loading the system (default socket: {DEFAULT_SOCKET_PATH})')
+@click.option('--rerank', is_flag=True, help='Re-rank extra retrieved chunks with MMR before answering')
+@source_option
+def query(session: str, question: str, system_info: str, sessions_file: str, sessions_db: str, embedding_model: str, socket_path: str,
+          rerank: bool, sources: tuple):
     """Query the conversational RAG system with a single question"""
     
     try:
+        # Use a running daemon if asked to, skipping system start-up entirely.
+        # The daemon answers with its own settings, so options it cannot
+        # honour are answered in-process instead.
+        response = None
+        if socket_path:
+            if sources or rerank or embedding_model:
+                console.print("[dim]--source, --rerank and -e are not supported by the daemon; loading the system[/dim]")
+            else:
+                response = query_daemon(socket_path, question, session,
+                                        daemon_files(system_info, sessions_file, sessions_db))
+        
+        if response is None:
+            from conversational_rag import ConversationalRAGSystem
+            
+            # Load system info
+            info = load_system_info(system_info)
+            if not info:
+                print_error("Error: No system info found. Run 'build' command first.")
+                sys.exit(1)
+            
+            # Initialize system
+            system = ConversationalRAGSystem(
+                model_name=info.get('model', 'llama3.1:8b-instruct-q8_0'),
+                embedding_model=embedding_model or info.get('embedding_model', FALLBACK_EMBEDDING_MODEL),
+                embedding_backend=info.get('embedding_backend', 'auto'),
+                llm_backend=info.get('llm_backend', 'ollama'),
+                llm_url=info.get('llm_url'),
+                vector_store_path=info.get('vector_store_path', './conversational_chroma_db'),
+                rerank=rerank
+            )
+            
+            # Load existing sessions if available
+            open_sessions(system, sessions_file, sessions_db)
+            
+            # Create session if not provided
+            if not session:
+                session = system.create_session()
+            
+            # Process the question (no spinner when output is piped)
+            response = run_with_spinner("Processing question...", system.query, question, session,
+                                        sources=list(sources) or None)
+            
+            # Save sessions
+            persist_sessions(system, sessions_file)
+        
+        # Display answer
+        console.print(f"\n[green]Answer:[/green] {response['answer']}")
+        
+        # Display metrics
+        console.print(f"\n[dim]Query time: {response['query_time']:.2f}s[/dim]")
+        console.print(f"[dim]Sources: {len(response['source_documents'])}[/dim]")
+        console.print(f"[dim]Session: {response['session_id']}[/dim]")
+        console.print(f"[dim]Messages in session: {response['message_count']}[/dim]")
+        
+    except Exception as e:
+        print_error(f"Error processing query: {e}")
+        sys.exit(1)
+
+@cli.command()
+@system_info_option
+@sessions_file_option
+@sessions_db_option
+@embedding_override_option
+@click.option('--socket', 'socket_path', default=DEFAULT_SOCKET_PATH, help='Unix socket to listen on')
+@semantic_cache_option
+def daemon(system_info: str, sessions_file: str, sessions_db: str, embedding_model: str, socket_path: str,
+           semantic_cache: bool):
+    """Keep the system loaded and answer 'query' commands over a Unix socket"""
+    
+    import asyncio
+    
+    try:
+        # Remove a stale socket left by a previous daemon, but never take over
+        # the socket of one that is still running
+        if os.path.exists(socket_path):
+            if socket_in_use(socket_path):
+                print_error(f"Error: A daemon is already listening on {socket_path}")
+                sys.exit(1)
+            os.remove(socket_path)
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+        
+        from conversational_rag import ConversationalRAGSystem
+        
         # Load system info
         info = load_system_info(system_info)
         if not info:
-            console.print("[red]Error: No system info found. Run 'build' command first.[/red]")
+            print_error("Error: No system info found. Run 'build' command first.")
             sys.exit(1)
         
-        # Initialize system
+        # Initialize system once for all requests
+        console.print("[blue]Initializing conversational RAG system...[/blue]")
         system = ConversationalRAGSystem(
             model_name=info.get('model', 'llama3.1:8b-instruct-q8_0'),
-            vector_store_path=info.get('vector_store_path', './conversational_chroma_db')
+            embedding_model=embedding_model or info.get('embedding_model', FALLBACK_EMBEDDING_MODEL),
+            embedding_backend=info.get('embedding_backend', 'auto'),
+            llm_backend=info.get('llm_backend', 'ollama'),
+            llm_url=info.get('llm_url'),
+            vector_store_path=info.get('vector_store_path', './conversational_chroma_db'),
+            semantic_cache=semantic_cache
         )
         
-        # Load existing sessions if available
-        if os.path.exists(sessions_file):
-            system.load_sessions(sessions_file)
+        open_sessions(system, sessions_file, sessions_db)
         
-        # Create session if not provided
-        if not session:
-            session = system.create_session()
+        files = daemon_files(system_info, sessions_file, sessions_db)
         
-        # Process the question
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            task = progress.add_task("Processing question...", total=None)
-            
-            response = system.query(question, session)
+        async def handle(reader, writer):
+            # Clients are served concurrently; questions arriving together
+            # are answered in one batch (see ConversationalRAGSystem.aquery)
+            line = await reader.readline()
+            if not line:
+                # Connection probe from socket_in_use
+                writer.close()
+                return
+            try:
+                request = json.loads(line)
+                if request.get("op") != "query":
+                    raise ValueError(f"Unsupported operation: {request.get('op')}")
+                mismatched = [f"--{key.replace('_', '-')}" for key, path in request.get("files", {}).items()
+                              if files.get(key) != path]
+                if mismatched:
+                    raise ValueError(f"Daemon was started with different {', '.join(mismatched)}")
+                
+                session = request.get("session") or system.create_session()
+                response = await system.aquery(request["question"], session)
+                persist_sessions(system, sessions_file)
+                
+                # Documents are not JSON serializable; send their sources
+                response["source_documents"] = [
+                    doc.metadata.get("source", "Unknown") for doc in response["source_documents"]
+                ]
+            except Exception as e:
+                response = {"error": str(e)}
             
-            progress.update(task, description="Generating response...")
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+            writer.close()
         
-        # Display answer
-        console.print(f"\n[green]Answer:[/green] {response['answer']}")
+        # Inode of the socket this process bound, so shutdown only removes its own
+        bound = {}
         
-        # Display metrics
-        console.print(f"\n[dim]Query time: {response['query_time']:.2f}s[/dim]")
-        console.print(f"[dim]Sources: {len(response['source_documents'])}[/dim]")
-        console.print(f"[dim]Session: {response['session_id']}[/dim]")
-        console.print(f"[dim]Messages in session: {response['message_count']}[/dim]")
+        async def serve():
+            server = await asyncio.start_unix_server(handle, path=socket_path)
+            bound["inode"] = os.stat(socket_path).st_ino
+            console.print(f"[green]Daemon listening on {socket_path}. Press Ctrl+C to stop.[/green]")
+            async with server:
+                await server.serve_forever()
         
-        # Save sessions
-        system.save_sessions(sessions_file)
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            console.print("\n[yellow]Daemon stopped[/yellow]")
+        finally:
+            try:
+                if os.stat(socket_path).st_ino == bound.get("inode"):
+                    os.remove(socket_path)
+            except FileNotFoundError:
+                pass
         
     except Exception as e:
-        console.print(f"[red]Error processing query: {e}[/red]")
+        print_error(f"Error running daemon: {e}")
         sys.exit(1)
 
 @cli.command()
-@click.option('--system-info', default='conversational_rag_system.json', help='System info file')
-@click.option('--sessions-file', default='conversational_sessions.json', help='Sessions file')
-def status(system_info: str, sessions_file: str):
+@system_info_option
+@sessions_file_option
+@sessions_db_option
+def status(system_info: str, sessions_file: str, sessions_db: str):
     """Check the status of the conversational RAG system"""
     
     try:
+        from conversational_rag import ConversationalRAGSystem
+        
         # Load system info
         info = load_system_info(system_info)
         
         if not info:
-            console.print("[red]No system info found. Run 'build' command first.[/red]")
+            print_error("No system info found. Run 'build' command first.")
             sys.exit(1)
         
         # Initialize system to get current status
         system = ConversationalRAGSystem(
             model_name=info.get('model', 'llama3.1:8b-instruct-q8_0'),
+            embedding_model=info.get('embedding_model', FALLBACK_EMBEDDING_MODEL),
+            embedding_backend=info.get('embedding_backend', 'auto'),
+            llm_backend=info.get('llm_backend', 'ollama'),
+            llm_url=info.get('llm_url'),
             vector_store_path=info.get('vector_store_path', './conversational_chroma_db')
         )
         
         # Load sessions if available
-        if os.path.exists(sessions_file):
-            system.load_sessions(sessions_file)
+        open_sessions(system, sessions_file, sessions_db)
         
         # Get current system info
         current_info = system.get_system_info()
@@ -379,11 +727,9 @@ def status(system_info: str, sessions_file: str):
         console.print(f"\n[blue]Sessions:[/blue]")
         if current_info['sessions']:
             console.print(f"Active sessions: {len(current_info['sessions'])}")
-            for session_id in current_info['sessions'][:5]:  # Show first 5
-                session = system.get_session(session_id)
-                if session:
-                    msg_count = len(session.messages)
-                    console.print(f"  {session_id}: {msg_count} messages")
+            # Show first 5, reading sessions directly instead of looking each one up
+            for session_id, session in itertools.islice(system.sessions.items(), 5):
+                console.print(f"  {session_id}: {session.message_count} messages")
             if len(current_info['sessions']) > 5:
                 console.print(f"  ... and {len(current_info['sessions']) - 5} more")
         else:
@@ -391,32 +737,65 @@ def status(system_info: str, sessions_file: str):
         
         # File status
         console.print(f"\n[blue]Files:[/blue]")
-        console.print(f"System info: {'✓' if os.path.exists(system_info) else '✗'} {system_info}")
-        console.print(f"Sessions file: {'✓' if os.path.exists(sessions_file) else '✗'} {sessions_file}")
-        console.print(f"Vector store: {'✓' if os.path.exists(current_info['vector_store_path']) else '✗'} {current_info['vector_store_path']}")
+        console.print(f"System info: {'✓' if path_exists(system_info) else '✗'} {system_info}")
+        if sessions_db:
+            console.print(f"Sessions database: ✓ {sessions_db}")
+        else:
+            console.print(f"Sessions file: {'✓' if path_exists(sessions_file) else '✗'} {sessions_file}")
+        console.print(f"Vector store: {'✓' if path_exists(current_info['vector_store_path']) else '✗'} {current_info['vector_store_path']}")
         
     except Exception as e:
-        console.print(f"[red]Error checking status: {e}[/red]")
+        print_error(f"Error checking status: {e}")
         sys.exit(1)
 
 @cli.command()
-@click.option('--sessions-file', default='conversational_sessions.json', help='Sessions file')
-def sessions(sessions_file: str):
+@sessions_file_option
+@sessions_db_option
+@click.option('--format', 'output_format', type=click.Choice(['table', 'ndjson', 'tsv']), default='table',
+              help='Output format (ndjson and tsv stream one line per session for scripts)')
+def sessions(sessions_file: str, sessions_db: str, output_format: str):
     """List all conversation sessions"""
     
     try:
-        if not os.path.exists(sessions_file):
-            console.print("[yellow]No sessions file found[/yellow]")
+        if sessions_db:
+            from storage import open_store
+            
+            store = open_store(sessions_db, sessions_file)
+            sessions_data = store.load_sessions()
+            store.close()
+        else:
+            if not os.path.exists(sessions_file):
+                if output_format == 'table':
+                    console.print("[yellow]No sessions file found[/yellow]")
+                return
+            
+            # Load sessions
+            sessions_data = read_json_file(sessions_file)
+        
+        # Stream machine-readable formats straight to stdout, one line per session
+        if output_format != 'table':
+            out = sys.stdout.buffer
+            for session_id, session_info in sessions_data.items():
+                record = {
+                    "id": session_id,
+                    "messages": len(session_info['messages']),
+                    "created_at": session_info['created_at'],
+                    "updated_at": session_info['updated_at']
+                }
+                if output_format == 'ndjson':
+                    out.write(orjson.dumps(record) if orjson else json.dumps(record).encode("utf-8"))
+                else:
+                    out.write("\t".join(str(value) for value in record.values()).encode("utf-8"))
+                out.write(b"\n")
+            out.flush()
             return
         
-        # Load sessions
-        with open(sessions_file, 'r') as f:
-            sessions_data = json.load(f)
-        
         if not sessions_data:
             console.print("[yellow]No sessions found[/yellow]")
             return
         
+        from rich.table import Table
+        
         # Display sessions
         table = Table(title="Conversation Sessions")
         table.add_column("Session ID", style="cyan")
@@ -424,94 +803,123 @@ def sessions(sessions_file: str):
         table.add_column("Created", style="yellow")
         table.add_column("Updated", style="yellow")
         
-        for session_id, session_info in sessions_data.items():
-            msg_count = len(session_info['messages'])
-            created = session_info['created_at'][:19]  # Remove microseconds
-            updated = session_info['updated_at'][:19]
-            
-            table.add_row(session_id, str(msg_count), created, updated)
+        # Build all rows in one pass (timestamps trimmed to remove microseconds)
+        rows = [
+            (session_id, f"{len(session_info['messages'])}",
+             session_info['created_at'][:19], session_info['updated_at'][:19])
+            for session_id, session_info in sessions_data.items()
+        ]
+        for row in rows:
+            table.add_row(*row)
         
         console.print(table)
         
     except Exception as e:
-        console.print(f"[red]Error listing sessions: {e}[/red]")
+        print_error(f"Error listing sessions: {e}")
         sys.exit(1)
 
 @cli.command()
 @click.option('--session', '-s', required=True, help='Session ID to delete')
-@click.option('--sessions-file', default='conversational_sessions.json', help='Sessions file')
-def delete_session(session: str, sessions_file: str):
+@sessions_file_option
+@sessions_db_option
+def delete_session(session: str, sessions_file: str, sessions_db: str):
     """Delete a conversation session"""
     
     try:
-        # Initialize system
-        system = ConversationalRAGSystem()
-        
-        # Load existing sessions
-        if os.path.exists(sessions_file):
-            system.load_sessions(sessions_file)
+        if sessions_db:
+            # Delete the rows directly, without loading the RAG system
+            from storage import open_store
+            
+            store = open_store(sessions_db, sessions_file)
+            deleted = store.delete_session(session)
+            store.close()
+        else:
+            from conversational_rag import ConversationalRAGSystem
+            
+            # Initialize system
+            system = ConversationalRAGSystem()
+            
+            # Load existing sessions
+            open_sessions(system, sessions_file, sessions_db)
+            
+            # Delete session and save the updated sessions file
+            deleted = system.delete_session(session)
+            if deleted:
+                persist_sessions(system, sessions_file)
         
-        # Delete session
-        if system.delete_session(session):
-            # Save updated sessions
-            system.save_sessions(sessions_file)
+        if deleted:
             console.print(f"[green]Deleted session: {session}[/green]")
         else:
-            console.print(f"[red]Session not found: {session}[/red]")
+            print_error(f"Session not found: {session}")
             sys.exit(1)
         
     except Exception as e:
-        console.print(f"[red]Error deleting session: {e}[/red]")
+        print_error(f"Error deleting session: {e}")
         sys.exit(1)
 
 @cli.command()
-def list_models():
+@click.option('--no-cache', is_flag=True, help='Bypass the cached model list')
+def list_models(no_cache: bool):
     """List available Ollama models"""
     
     try:
         import subprocess
         
+        # Reuse a recent model list instead of forking 'ollama list'
+        cached = None if no_cache else read_models_cache()
+        if cached is not None:
+            console.print("[blue]Available Ollama Models:[/blue]")
+            console.print(cached)
+            return
+        
         # Run ollama list command
         result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
         
         if result.returncode == 0:
+            write_models_cache(result.stdout)
             console.print("[blue]Available Ollama Models:[/blue]")
             console.print(result.stdout)
         else:
-            console.print("[red]Error running 'ollama list'[/red]")
+            print_error("Error running 'ollama list'")
             console.print(f"Error: {result.stderr}")
             sys.exit(1)
         
     except FileNotFoundError:
-        console.print("[red]Ollama not found. Please install Ollama first.[/red]")
+        print_error("Ollama not found. Please install Ollama first.")
         sys.exit(1)
     except Exception as e:
-        console.print(f"[red]Error listing models: {e}[/red]")
+        print_error(f"Error listing models: {e}")
         sys.exit(1)
 
 @cli.command()
-@click.option('--system-info', default='conversational_rag_system.json', help='System info file')
-@click.option('--sessions-file', default='conversational_sessions.json', help='Sessions file')
-def test(system_info: str, sessions_file: str):
+@system_info_option
+@sessions_file_option
+@sessions_db_option
+def test(system_info: str, sessions_file: str, sessions_db: str):
     """Test the conversational RAG system with sample questions"""
     
     try:
+        from conversational_rag import ConversationalRAGSystem
+        
         # Load system info
         info = load_system_info(system_info)
         if not info:
-            console.print("[red]Error: No system info found. Run 'build' command first.[/red]")
+            print_error("Error: No system info found. Run 'build' command first.")
             sys.exit(1)
         
         # Initialize system
         console.print("[blue]Testing conversational RAG system...[/blue]")
         system = ConversationalRAGSystem(
             model_name=info.get('model', 'llama3.1:8b-instruct-q8_0'),
+            embedding_model=info.get('embedding_model', FALLBACK_EMBEDDING_MODEL),
+            embedding_backend=info.get('embedding_backend', 'auto'),
+            llm_backend=info.get('llm_backend', 'ollama'),
+            llm_url=info.get('llm_url'),
             vector_store_path=info.get('vector_store_path', './conversational_chroma_db')
         )
         
         # Load sessions if available
-        if os.path.exists(sessions_file):
-            system.load_sessions(sessions_file)
+        open_sessions(system, sessions_file, sessions_db)
         
         # Create test session
         test_session = system.create_session("test_session")
@@ -527,28 +935,22 @@ def test(system_info: str, sessions_file: str):
             console.print(f"\n[blue]Test {i}: {question}[/blue]")
             
             try:
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=console
-                ) as progress:
-                    task = progress.add_task("Processing...", total=None)
-                    response = system.query(question, test_session)
+                response = run_with_spinner("Processing...", system.query, question, test_session)
                 
                 console.print(f"[green]✓ Answer:[/green] {response['answer'][:200]}...")
                 console.print(f"[dim]Time: {response['query_time']:.2f}s, Sources: {len(response['source_documents'])}[/dim]")
                 
             except Exception as e:
-                console.print(f"[red]✗ Error: {e}[/red]")
+                print_error(f"✗ Error: {e}")
         
         # Clean up test session
         system.delete_session(test_session)
-        system.save_sessions(sessions_file)
+        persist_sessions(system, sessions_file)
         
         console.print(f"\n[green]✓ Conversational RAG system test completed![/green]")
         
     except Exception as e:
-        console.print(f"[red]Error testing system: {e}[/red]")
+        print_error(f"Error testing system: {e}")
         sys.exit(1)
 
 if __name__ == '__main__':
@@ -7,21 +7,33 @@ and allows for follow-up questions using LangGraph for workflow orchestration.
 """
 
 import os
+import re
 import time
 import json
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+import itertools
+import functools
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
 
+import numpy as np
+
 # LangChain imports
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.text_splitter import CharacterTextSplitter, RecursiveCharacterTextSplitter, TextSplitter
 from langchain.schema import Document, BaseMessage, HumanMessage, AIMessage
 from langchain_ollama import OllamaLLM
 from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferMemory
+from langchain.memory import ConversationSummaryBufferMemory
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseLanguageModel
 
 # LangGraph imports
 from langgraph.graph import StateGraph, END
@@ -29,8 +41,40 @@ from langgraph.checkpoint.memory import MemorySaver
 
 # Web scraping
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        # selectolax < 0.3 only ships the Modest backend
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml  # noqa: F401  (only used as a BeautifulSoup backend)
+    BS4_PARSER = 'lxml'
+except ImportError:
+    BS4_PARSER = 'html.parser'
+
+# Session storage
+from storage import SessionStore, open_store
+from query_cache import SemanticQueryCache
+from embedding_backends import OllamaBatchEmbeddings, Model2VecEmbeddings, OnnxInt8Embeddings, batched, detect_device, normalize_rows
+
 # Rich for beautiful output
 from rich.console import Console
 from rich.panel import Panel
@@ -50,6 +94,121 @@ logger = logging.getLogger(__name__)
 
 console = Console()
 
+# Separators used by each chunking strategy, most to least preferred
+CHUNK_SEPARATORS = {
+    "recursive": ["\n\n", "\n", ". ", " ", ""],
+    "sentence": [". ", "? ", "! ", "\n", " ", ""],
+    "token": ["\n\n", "\n", ". ", " ", ""],
+}
+
+# Tokenizer used to measure chunks with the 'token' strategy when the
+# embedding model is not a HuggingFace model
+DEFAULT_TOKENIZER_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Batches with less text than this are split in-process; below it, starting
+# worker processes costs more than the splitting itself
+PARALLEL_SPLIT_MIN_CHARS = 2_000_000
+
+@functools.lru_cache(maxsize=None)
+def make_text_splitter(strategy: str, chunk_size: int, chunk_overlap: int,
+                       tokenizer_model: Optional[str] = None) -> TextSplitter:
+    """
+    Create (once per process and settings) the text splitter for a chunking strategy
+    
+    Args:
+        strategy: 'fixed', 'recursive', 'sentence' or 'token'
+        chunk_size: Chunk size, in tokens for 'token' and characters otherwise
+        chunk_overlap: Chunk overlap, in the same unit as chunk_size
+        tokenizer_model: HuggingFace tokenizer used by the 'token' strategy
+        
+    Returns:
+        Text splitter instance
+    """
+    if strategy == "fixed":
+        return CharacterTextSplitter(
+            separator="",
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+        )
+    
+    if strategy == "token":
+        from transformers import AutoTokenizer
+        
+        return RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+            AutoTokenizer.from_pretrained(tokenizer_model or DEFAULT_TOKENIZER_MODEL),
+            separators=CHUNK_SEPARATORS[strategy],
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+    
+    return RecursiveCharacterTextSplitter(
+        separators=CHUNK_SEPARATORS[strategy],
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+    )
+
+def _split_in_worker(settings: Tuple[str, int, int, Optional[str]], documents: List[Document]) -> List[Document]:
+    """Split documents in a worker process, building the splitter there (splitters do not pickle)"""
+    return make_text_splitter(*settings).split_documents(documents)
+
+# HNSW index settings for new Chroma collections: larger graph degree and
+# build/search beam widths than Chroma's defaults for better recall on large
+# collections. Every embedding backend returns unit vectors, so inner product
+# ranks like cosine without re-normalizing at search time. Only applied when
+# a collection is created.
+HNSW_METADATA = {
+    "hnsw:space": "ip",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+}
+
+# Runs of whitespace collapsed to a single space in extracted text
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Page elements dropped before text extraction
+STRIP_TAGS = ["script", "style", "nav", "footer", "header"]
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Extracted page text and HTTP validators for conditional requests, kept
+# outside the vector store so rebuilds into a fresh store still reuse them
+URL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "langgraph_adv", "url_cache")
+
+def run_async(coroutine):
+    """
+    Run a coroutine to completion from synchronous code
+    
+    When the calling thread already runs an event loop (Jupyter, async
+    callers), a second loop cannot be started on it, so the coroutine runs
+    on a new loop in a worker thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+def write_json(obj: Any, filepath: str):
+    """Write obj as indented JSON, using orjson when it is installed"""
+    if orjson is not None:
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filepath, 'w') as f:
+            json.dump(obj, f, indent=2)
+
+def read_json(filepath: str) -> Any:
+    """Read a JSON file, using orjson when it is installed"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 @dataclass
 class ConversationMessage:
     """Represents a message in the conversation"""
@@ -60,12 +219,150 @@ class ConversationMessage:
 
 @dataclass
 class ConversationSession:
-    """Represents a conversation session"""
+    """
+    Represents a conversation session
+    
+    Messages are stored column-wise in parallel lists (timestamps as epoch
+    seconds) rather than as one object per message; the messages property
+    rebuilds ConversationMessage objects when a caller needs them.
+    """
     session_id: str
-    messages: List[ConversationMessage]
     created_at: datetime
     updated_at: datetime
     metadata: Optional[Dict[str, Any]] = None
+    roles: List[str] = field(default_factory=list)
+    contents: List[str] = field(default_factory=list)
+    timestamps: List[float] = field(default_factory=list)
+    metadatas: List[Optional[Dict[str, Any]]] = field(default_factory=list)
+    
+    @property
+    def message_count(self) -> int:
+        """Number of messages in the session"""
+        return len(self.roles)
+    
+    @property
+    def messages(self) -> List[ConversationMessage]:
+        """Messages of the session as ConversationMessage objects"""
+        return self.recent_messages()
+    
+    def recent_messages(self, limit: Optional[int] = None) -> List[ConversationMessage]:
+        """Build ConversationMessage objects for only the last limit messages (all if None)"""
+        start = 0 if limit is None else max(0, len(self.roles) - limit)
+        return [
+            ConversationMessage(role, content, datetime.fromtimestamp(ts), metadata)
+            for role, content, ts, metadata in zip(
+                self.roles[start:], self.contents[start:], self.timestamps[start:], self.metadatas[start:]
+            )
+        ]
+    
+    def append_message(self, role: str, content: str, timestamp: float,
+                       metadata: Optional[Dict[str, Any]] = None):
+        """Append a message to the session's columns"""
+        self.roles.append(role)
+        self.contents.append(content)
+        self.timestamps.append(timestamp)
+        self.metadatas.append(metadata)
+
+EMBEDDING_BACKENDS = ("auto", "huggingface", "onnx-int8", "ollama", "model2vec")
+
+def resolve_embedding_backend(backend: str, model: str) -> str:
+    """Resolve the 'auto' embedding backend: HuggingFace for repository IDs (containing '/'), else Ollama"""
+    if backend == "auto":
+        return "huggingface" if '/' in model else "ollama"
+    return backend
+
+@functools.lru_cache(maxsize=None)
+def make_embeddings(backend: str, model: str, embed_batch_size: int) -> Embeddings:
+    """
+    Create (once per process and settings) the embeddings client for a model
+    
+    Systems built with the same settings share the client, so a second
+    ConversationalRAGSystem does not load the model again.
+    
+    With the 'auto' backend, HuggingFace repository IDs (containing '/') are
+    embedded locally and anything else is treated as an Ollama model tag.
+    
+    Args:
+        backend: One of EMBEDDING_BACKENDS
+        model: Embedding model name
+        embed_batch_size: Chunks per request for the Ollama backend
+        
+    Returns:
+        Embeddings client
+    """
+    backend = resolve_embedding_backend(backend, model)
+    
+    if backend == "model2vec":
+        return Model2VecEmbeddings(model=model)
+    
+    if backend == "onnx-int8":
+        return OnnxInt8Embeddings(model=model)
+    
+    if backend == "huggingface":
+        # Large batches amortize per-forward-pass overhead across many chunks
+        return HuggingFaceEmbeddings(
+            model_name=model,
+            model_kwargs={"device": detect_device()},
+            encode_kwargs={"batch_size": 512, "normalize_embeddings": True}
+        )
+    
+    return OllamaBatchEmbeddings(model=model, batch_size=embed_batch_size)
+
+LLM_BACKENDS = ("ollama", "vllm", "tgi")
+
+# Maximum sequences vLLM decodes together in one batch; this is the main
+# throughput knob when several users query at once
+VLLM_MAX_NUM_SEQS = 32
+
+# How long Ollama keeps the model loaded between requests. While it stays
+# resident, a prompt that starts with the previous prompt's tokens (the same
+# instructions and earlier turns) reuses their KV cache instead of
+# re-processing them.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+# Semantic cache keys blend the question with the session's previous questions,
+# so a follow-up such as "How does it work?" only matches the same follow-up
+# asked in a similar conversation
+CACHE_CONTEXT_TURNS = 2
+CACHE_CONTEXT_WEIGHT = 0.3
+
+# Recent messages of a session passed as chat history to batched questions,
+# which do not use the chain's shared memory (see aquery_batch)
+BATCH_HISTORY_MESSAGES = 6
+
+class AnswerTokenHandler(BaseCallbackHandler):
+    """
+    Callback handler that forwards streamed answer tokens to a function
+    
+    ConversationalRetrievalChain also calls the LLM to condense follow-up
+    questions; only tokens from LLM runs nested under the answer (combine
+    documents) chain are forwarded.
+    """
+    
+    def __init__(self, on_token: Callable[[str], None], answer_chain_name: str):
+        """
+        Args:
+            on_token: Function called with each answer token
+            answer_chain_name: Run name of the chain that generates the answer
+        """
+        self.on_token = on_token
+        self.answer_chain_name = answer_chain_name
+        self._answer_runs = set()
+    
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        """Track the answer chain and the chains nested under it"""
+        if kwargs.get("name") == self.answer_chain_name or parent_run_id in self._answer_runs:
+            self._answer_runs.add(run_id)
+    
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        """Track LLM runs nested under the answer chain"""
+        if parent_run_id in self._answer_runs:
+            self._answer_runs.add(run_id)
+    
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs):
+        """Forward tokens of answer LLM runs"""
+        if run_id in self._answer_runs:
+            self.on_token(token)
 
 class ConversationalRAGSystem:
     """
@@ -80,22 +377,58 @@ class ConversationalRAGSystem:
         max_tokens: int = 4096,
         temperature: float = 0.1,
         chunk_size: int = 1000,
-        chunk_overlap: int = 200,
-        k_retrieve: int = 4
+        chunk_overlap: int = 100,
+        k_retrieve: int = 4,
+        embed_batch_size: int = 32,
+        chunk_strategy: str = "recursive",
+        fetch_workers: int = 16,
+        split_workers: int = os.cpu_count() or 1,
+        rerank: bool = False,
+        embedding_backend: str = "auto",
+        memory_max_tokens: int = 512,
+        semantic_cache: bool = False,
+        llm_backend: str = "ollama",
+        llm_url: Optional[str] = None,
+        llm: Optional[BaseLanguageModel] = None
     ):
         """
         Initialize the conversational RAG system
         
         Args:
             model_name: Ollama model name
-            embedding_model: HuggingFace embedding model
+            embedding_model: HuggingFace embedding model (e.g. 'sentence-transformers/...')
+                or Ollama embedding model tag (e.g. 'nomic-embed-text')
             vector_store_path: Path to store vector database
             max_tokens: Maximum tokens for responses
             temperature: Model temperature
             chunk_size: Document chunk size
             chunk_overlap: Document chunk overlap
             k_retrieve: Number of documents to retrieve
+            embed_batch_size: Chunks per request when embedding with Ollama
+            chunk_strategy: Chunking strategy ('fixed', 'recursive', 'sentence', or
+                'token' to measure chunk_size/chunk_overlap in tokenizer tokens)
+            fetch_workers: Number of URLs fetched concurrently
+            split_workers: Worker processes used to split large batches of documents
+            rerank: Re-rank extra retrieval candidates with MMR before answering
+            embedding_backend: 'huggingface', 'onnx-int8', 'ollama', 'model2vec', or 'auto' to
+                pick HuggingFace or Ollama from the embedding model name
+            memory_max_tokens: Chat history kept verbatim in the prompt; older
+                turns are summarized by the LLM
+            semantic_cache: Answer near-identical repeated questions from a cache
+                instead of running retrieval and generation again
+            llm_backend: 'ollama', 'vllm' (in-process, continuous batching) or
+                'tgi' (HuggingFace Text Generation Inference server)
+            llm_url: Server URL for the 'tgi' backend
+            llm: Ready-made language model to use instead of creating one from
+                llm_backend (e.g. a fake LLM in tests)
         """
+        if chunk_strategy != "fixed" and chunk_strategy not in CHUNK_SEPARATORS:
+            raise ValueError(f"Unknown chunk strategy: {chunk_strategy}")
+        if embedding_backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend: {embedding_backend}")
+        if llm_backend not in LLM_BACKENDS:
+            raise ValueError(f"Unknown LLM backend: {llm_backend}")
+        
         self.model_name = model_name
         self.embedding_model = embedding_model
         self.vector_store_path = vector_store_path
@@ -104,9 +437,24 @@ class ConversationalRAGSystem:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.k_retrieve = k_retrieve
+        self.embed_batch_size = embed_batch_size
+        self.chunk_strategy = chunk_strategy
+        self.fetch_workers = max(1, fetch_workers)
+        self.split_workers = max(1, split_workers)
+        self.rerank = rerank
+        self.embedding_backend = embedding_backend
+        self.memory_max_tokens = memory_max_tokens
+        self.llm_backend = llm_backend
+        self.llm_url = llm_url
+        self.query_cache = SemanticQueryCache() if semantic_cache else None
+        
+        # Pending async queries, created on first use inside the event loop (see aquery)
+        self._pending: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self.batch_window = 0.01
         
         # Initialize components
-        self.llm = None
+        self.llm = llm
         self.embeddings = None
         self.vectorstore = None
         self.conversation_chain = None
@@ -115,6 +463,17 @@ class ConversationalRAGSystem:
         # Conversation sessions
         self.sessions: Dict[str, ConversationSession] = {}
         
+        # Running totals for incremental builds (see add_urls_batch)
+        self._build_urls: set = set()
+        self._build_document_count = 0
+        self._build_chunk_count = 0
+        
+        # URLs already in the vector store, loaded on first use (see _get_ingested_urls)
+        self._ingested_urls: Optional[set] = None
+        
+        # Optional SQLite store that sessions are written through to
+        self.session_store: Optional[SessionStore] = None
+        
         # Initialize the system
         self._initialize_system()
     
@@ -123,20 +482,29 @@ class ConversationalRAGSystem:
         logger.info("Initializing conversational RAG system components...")
         
         try:
-            # Initialize LLM
-            self.llm = OllamaLLM(
-                model=self.model_name,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
+            # Initialize LLM unless one was supplied
+            if self.llm is None:
+                self.llm = self._create_llm()
             
             # Initialize embeddings
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name=self.embedding_model
+            self.embeddings = self._create_embeddings()
+            
+            # Pooled HTTP session so fetches to the same host reuse connections
+            self._http = requests.Session()
+            self._http.headers.update(HTTP_HEADERS)
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
             )
+            self._http.mount("https://", adapter)
+            self._http.mount("http://", adapter)
             
-            # Initialize memory
-            self.memory = ConversationBufferMemory(
+            # Initialize memory: recent turns verbatim, older turns summarized,
+            # so the prompt stays bounded as the conversation grows
+            self.memory = ConversationSummaryBufferMemory(
+                llm=self.llm,
+                max_token_limit=self.memory_max_tokens,
                 memory_key="chat_history",
                 return_messages=True,
                 output_key="answer"
@@ -151,6 +519,54 @@ class ConversationalRAGSystem:
             logger.error(f"Error initializing conversational RAG system: {e}")
             raise
     
+    def _create_llm(self):
+        """
+        Create the LLM client for the configured backend
+        
+        Returns:
+            LangChain LLM
+        """
+        if self.llm_backend == "vllm":
+            from langchain_community.llms import VLLM
+            
+            return VLLM(
+                model=self.model_name,
+                trust_remote_code=True,
+                max_new_tokens=self.max_tokens,
+                temperature=self.temperature,
+                vllm_kwargs={
+                    "gpu_memory_utilization": 0.9,
+                    "max_num_seqs": VLLM_MAX_NUM_SEQS,
+                    # Reuse KV cache across prompts sharing a prefix
+                    "enable_prefix_caching": True
+                }
+            )
+        
+        if self.llm_backend == "tgi":
+            from langchain_community.llms import HuggingFaceTextGenInference
+            
+            return HuggingFaceTextGenInference(
+                inference_server_url=self.llm_url or "http://localhost:8080/",
+                max_new_tokens=self.max_tokens,
+                temperature=self.temperature
+            )
+        
+        return OllamaLLM(
+            model=self.model_name,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            keep_alive=OLLAMA_KEEP_ALIVE
+        )
+    
+    def _create_embeddings(self) -> Embeddings:
+        """
+        Get the embeddings client for the configured model (shared per process)
+        
+        Returns:
+            Embeddings client
+        """
+        return make_embeddings(self.embedding_backend, self.embedding_model, self.embed_batch_size)
+    
     def _load_existing_vectorstore(self):
         """Load existing vector store if available"""
         try:
@@ -219,27 +635,13 @@ class ConversationalRAGSystem:
             logger.info(f"Fetching content from: {url}")
             start_time = time.time()
             
-            # Fetch the webpage
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            # Parse HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Extract text content
-            text = soup.get_text()
-            
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
+            # Fetch the webpage, revalidating any cached copy
+            response = self._http.get(url, timeout=30, headers=self._conditional_headers(url))
+            if response.status_code == 304:
+                text = self._text_from_response(url, None, {})
+            else:
+                response.raise_for_status()
+                text = self._text_from_response(url, response.content, response.headers)
             
             fetch_time = time.time() - start_time
             logger.info(f"Fetched content in {fetch_time:.2f}s, length: {len(text)} characters")
@@ -250,39 +652,234 @@ class ConversationalRAGSystem:
             logger.error(f"Error fetching content from {url}: {e}")
             raise
     
+    def _url_cache_paths(self, url: str) -> Tuple[str, str]:
+        """Paths of the cached text and validator metadata for a URL"""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(URL_CACHE_DIR, f"{key}.txt"), os.path.join(URL_CACHE_DIR, f"{key}.meta.json")
+    
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Build conditional request headers from a URL's cached validators
+        
+        Args:
+            url: Validated URL
+            
+        Returns:
+            If-None-Match / If-Modified-Since headers, empty if nothing is cached
+        """
+        text_path, meta_path = self._url_cache_paths(url)
+        if not (os.path.exists(text_path) and os.path.exists(meta_path)):
+            return {}
+        
+        meta = read_json(meta_path)
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+    
+    def _text_from_response(self, url: str, body: Optional[bytes], headers: Any) -> str:
+        """
+        Get page text from a response body, or from the cache when not modified
+        
+        Extracted text is cached when the server sent an ETag or Last-Modified
+        validator, so later builds can skip the download and parsing with a
+        conditional request.
+        
+        Args:
+            url: Validated URL
+            body: Raw response body, or None for a 304 Not Modified response
+            headers: Response headers
+            
+        Returns:
+            Extracted text content
+        """
+        text_path, meta_path = self._url_cache_paths(url)
+        if body is None:
+            logger.info(f"Using cached content for: {url}")
+            with open(text_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        
+        text = self.extract_text(body)
+        
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if etag or last_modified:
+            os.makedirs(os.path.dirname(text_path), exist_ok=True)
+            with open(text_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            write_json({"url": url, "etag": etag, "last_modified": last_modified}, meta_path)
+        
+        return text
+    
+    def extract_text(self, content: bytes) -> str:
+        """
+        Extract readable text from raw HTML
+        
+        Uses the selectolax C parser when available, otherwise BeautifulSoup
+        (with lxml if installed).
+        
+        Args:
+            content: Raw HTML bytes
+            
+        Returns:
+            Extracted text content
+        """
+        if HTMLParser is not None:
+            tree = HTMLParser(content)
+            for node in tree.css(", ".join(STRIP_TAGS)):
+                node.decompose()
+            root = tree.body or tree.root
+            text = root.text(separator="\n") if root is not None else ""
+        else:
+            soup = BeautifulSoup(content, BS4_PARSER)
+            for element in soup(STRIP_TAGS):
+                element.decompose()
+            text = soup.get_text()
+        
+        # Clean up whitespace
+        return WHITESPACE_RE.sub(" ", text).strip()
+    
+    async def _fetch_async(self, session: "aiohttp.ClientSession", url: str) -> Tuple[str, Optional[bytes], Any]:
+        """
+        Fetch the raw body of a URL, revalidating any cached copy
+        
+        Args:
+            session: Shared aiohttp session
+            url: URL to fetch
+            
+        Returns:
+            Validated URL, raw response body (None if not modified) and response headers
+        """
+        url = self.validate_url(url)
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=30),
+                               headers=self._conditional_headers(url)) as response:
+            if response.status == 304:
+                return url, None, {}
+            response.raise_for_status()
+            return url, await response.read(), response.headers
+    
+    async def _fetch_all(self, urls: List[str]) -> List[Any]:
+        """
+        Fetch all URLs concurrently over one connection pool
+        
+        Args:
+            urls: URLs to fetch
+            
+        Returns:
+            _fetch_async result or the raised exception for each URL, in input order
+        """
+        connector = aiohttp.TCPConnector(limit=self.fetch_workers, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector, headers=HTTP_HEADERS) as session:
+            return await asyncio.gather(
+                *(self._fetch_async(session, url) for url in urls),
+                return_exceptions=True
+            )
+    
+    def _document_from_raw(self, url: str, raw: Any) -> Optional[Document]:
+        """
+        Parse a prefetched response body into a Document
+        
+        Args:
+            url: Source URL
+            raw: _fetch_async result, or the exception raised while fetching it
+            
+        Returns:
+            Document object, or None if the URL could not be fetched
+        """
+        if isinstance(raw, BaseException):
+            logger.error(f"Error creating document from {url}: {raw}")
+            return None
+        
+        try:
+            doc = Document(
+                page_content=self._text_from_response(*raw),
+                metadata={"source": url, "type": "webpage"}
+            )
+            logger.info(f"Created document from: {url}")
+            return doc
+            
+        except Exception as e:
+            logger.error(f"Error creating document from {url}: {e}")
+            return None
+    
+    def _create_document(self, url: str) -> Optional[Document]:
+        """
+        Fetch a single URL and wrap it in a Document
+        
+        Args:
+            url: URL to fetch
+            
+        Returns:
+            Document object, or None if the URL could not be fetched
+        """
+        try:
+            content = self.fetch_url_content(url)
+            doc = Document(
+                page_content=content,
+                metadata={"source": url, "type": "webpage"}
+            )
+            logger.info(f"Created document from: {url}")
+            return doc
+            
+        except Exception as e:
+            logger.error(f"Error creating document from {url}: {e}")
+            return None
+    
     def create_documents(self, urls: List[str]) -> List[Document]:
         """
         Create documents from URLs
         
+        URLs are fetched concurrently since fetching is network-bound: with
+        aiohttp installed all requests share one event loop and the HTML is
+        then parsed in a thread pool, otherwise each URL is fetched and parsed
+        in a worker thread. The returned documents keep the order of the input URLs.
+        
         Args:
             urls: List of URLs to fetch
             
         Returns:
             List of Document objects
         """
-        documents = []
+        if not urls:
+            return []
         
-        for url in urls:
-            try:
-                content = self.fetch_url_content(url)
-                doc = Document(
-                    page_content=content,
-                    metadata={"source": url, "type": "webpage"}
-                )
-                documents.append(doc)
-                logger.info(f"Created document from: {url}")
-                
-            except Exception as e:
-                logger.error(f"Error creating document from {url}: {e}")
-                continue
+        if aiohttp is not None:
+            raw_pages = run_async(self._fetch_all(urls))
+            with ThreadPoolExecutor(max_workers=min(self.fetch_workers, len(urls))) as executor:
+                results = list(executor.map(self._document_from_raw, urls, raw_pages))
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.fetch_workers, len(urls))) as executor:
+                results = list(executor.map(self._create_document, urls))
+        
+        documents = [doc for doc in results if doc is not None]
         
         logger.info(f"Created {len(documents)} documents")
         return documents
     
+    def _splitter_settings(self) -> Tuple[str, int, int, Optional[str]]:
+        """Arguments for make_text_splitter for the configured chunking strategy"""
+        tokenizer_model = None
+        if self.chunk_strategy == "token" and '/' in self.embedding_model:
+            tokenizer_model = self.embedding_model
+        return (self.chunk_strategy, self.chunk_size, self.chunk_overlap, tokenizer_model)
+    
+    def _create_text_splitter(self) -> TextSplitter:
+        """
+        Create the text splitter for the configured chunking strategy
+        
+        Returns:
+            Text splitter instance
+        """
+        return make_text_splitter(*self._splitter_settings())
+    
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """
         Split documents into chunks
         
+        Large batches are split across worker processes, one document per task.
+        
         Args:
             documents: List of documents to split
             
@@ -290,14 +887,17 @@ class ConversationalRAGSystem:
             List of split documents
         """
         try:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=self.chunk_size,
-                chunk_overlap=self.chunk_overlap,
-                length_function=len,
-            )
-            
-            split_docs = text_splitter.split_documents(documents)
-            logger.info(f"Split {len(documents)} documents into {len(split_docs)} chunks")
+            total_chars = sum(len(doc.page_content) for doc in documents)
+            if self.split_workers > 1 and len(documents) > 1 and total_chars >= PARALLEL_SPLIT_MIN_CHARS:
+                settings = self._splitter_settings()
+                with ProcessPoolExecutor(max_workers=min(self.split_workers, len(documents))) as executor:
+                    split_lists = executor.map(
+                        _split_in_worker, itertools.repeat(settings), [[doc] for doc in documents]
+                    )
+                    split_docs = [chunk for chunks in split_lists for chunk in chunks]
+            else:
+                split_docs = self._create_text_splitter().split_documents(documents)
+            logger.info(f"Split {len(documents)} documents into {len(split_docs)} chunks ({self.chunk_strategy})")
             
             return split_docs
             
@@ -319,11 +919,16 @@ class ConversationalRAGSystem:
             logger.info("Creating vector store...")
             start_time = time.time()
             
+            # Sort chunks by length so each embedding batch holds similarly sized
+            # texts (less padding); Chroma embeds all chunks in one call
+            documents = sorted(documents, key=lambda doc: len(doc.page_content))
+            
             # Create vector store
             vectorstore = Chroma.from_documents(
                 documents=documents,
                 embedding=self.embeddings,
-                persist_directory=self.vector_store_path
+                persist_directory=self.vector_store_path,
+                collection_metadata=HNSW_METADATA
             )
             
             # Persist the vector store
@@ -348,28 +953,182 @@ class ConversationalRAGSystem:
         try:
             logger.info("Setting up conversational retrieval chain...")
             
+            if self.rerank:
+                # Imported lazily: compiling the re-rank kernels is only worth it when used
+                from rerank import MMRRerankRetriever, warmup
+                
+                warmup()
+                retriever = MMRRerankRetriever(
+                    vectorstore=vectorstore,
+                    k=self.k_retrieve,
+                    fetch_k=self.k_retrieve * 4
+                )
+            else:
+                retriever = vectorstore.as_retriever(search_kwargs={"k": self.k_retrieve})
+            
             # Create the conversational chain
             self.conversation_chain = ConversationalRetrievalChain.from_llm(
                 llm=self.llm,
-                retriever=vectorstore.as_retriever(search_kwargs={"k": self.k_retrieve}),
+                retriever=retriever,
                 memory=self.memory,
                 return_source_documents=True,
                 verbose=False
             )
             
+            # Run name of the answer step, used to pick out its streamed tokens
+            self._answer_chain_name = type(self.conversation_chain.combine_docs_chain).__name__
+            
             logger.info("Conversational retrieval chain set up successfully")
             
         except Exception as e:
             logger.error(f"Error setting up conversational chain: {e}")
             raise
     
-    def build_rag_from_urls(self, urls: List[str], output_file: str = "conversational_rag_system.json") -> Dict[str, Any]:
+    def _ingested_urls_path(self) -> str:
+        """Path of the sidecar file listing URLs already in the vector store"""
+        return os.path.join(self.vector_store_path, "ingested_urls.json")
+    
+    def _index_settings(self) -> Dict[str, Any]:
+        """Settings that determine the stored chunks and vectors"""
+        return {
+            "embedding_model": self.embedding_model,
+            "embedding_backend": resolve_embedding_backend(self.embedding_backend, self.embedding_model),
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "chunk_strategy": self.chunk_strategy
+        }
+    
+    def _get_ingested_urls(self) -> set:
+        """
+        Get the set of URLs already indexed in the vector store
+        
+        Read from the sidecar file, or from the sources stored in the
+        collection for stores built before the sidecar existed. The sidecar
+        also records the embedding and chunking settings of the store; adding
+        to it with different settings is refused, since the new chunks and
+        query vectors would not match the stored ones.
+        
+        Returns:
+            Set of source URLs
+            
+        Raises:
+            ValueError: If the store was built with different settings
+        """
+        if self._ingested_urls is None:
+            if os.path.exists(self._ingested_urls_path()):
+                data = read_json(self._ingested_urls_path())
+                # Older sidecars are a bare list of URLs without settings
+                if isinstance(data, dict):
+                    stored = data.get("settings", {})
+                    current = self._index_settings()
+                    changed = {key: (stored[key], value) for key, value in current.items()
+                               if key in stored and stored[key] != value}
+                    if changed:
+                        details = ", ".join(f"{key}: {old!r} -> {new!r}" for key, (old, new) in changed.items())
+                        raise ValueError(
+                            f"Vector store {self.vector_store_path} was built with different settings ({details}). "
+                            f"Delete it or build into another directory."
+                        )
+                    data = data.get("urls", [])
+                self._ingested_urls = set(data)
+            elif self.vectorstore is not None:
+                metadatas = self.vectorstore._collection.get(include=["metadatas"])["metadatas"]
+                self._ingested_urls = {meta.get("source") for meta in metadatas if meta}
+            else:
+                self._ingested_urls = set()
+        return self._ingested_urls
+    
+    def add_urls_batch(self, urls: List[str]) -> int:
+        """
+        Fetch, split and index a batch of URLs
+        
+        Documents and chunks are discarded once embedded, so building from many
+        URLs in batches keeps memory bounded by the batch size. URLs already in
+        the vector store, repeated in the batch or tried by an earlier batch of
+        this build are skipped, so re-running a build only pays for new URLs.
+        Call finalize() after the last batch.
+        
+        Args:
+            urls: URLs in this batch
+            
+        Returns:
+            Number of chunks added to the vector store
+        """
+        ingested = self._get_ingested_urls()
+        new_urls = [url for url in dict.fromkeys(urls) if url not in ingested and url not in self._build_urls]
+        if len(new_urls) < len(urls):
+            logger.info(f"Skipping {len(urls) - len(new_urls)} already indexed or repeated URLs")
+        
+        documents = self.create_documents(new_urls)
+        split_docs = self.split_documents(documents)
+        
+        if split_docs:
+            if self.vectorstore is None:
+                self.vectorstore = self.create_vectorstore(split_docs)
+            else:
+                self.vectorstore.add_documents(split_docs)
+            
+            ingested.update(doc.metadata["source"] for doc in documents)
+            write_json({"settings": self._index_settings(), "urls": sorted(ingested)}, self._ingested_urls_path())
+        
+        self._build_urls.update(new_urls)
+        self._build_document_count += len(documents)
+        self._build_chunk_count += len(split_docs)
+        
+        return len(split_docs)
+    
+    def finalize(self, output_file: str = "conversational_rag_system.json") -> Dict[str, Any]:
+        """
+        Set up the conversational chain and save system info after batched indexing
+        
+        Args:
+            output_file: Output file for system info
+            
+        Returns:
+            System information dictionary
+        """
+        if self.vectorstore is None:
+            raise ValueError("No documents were indexed. Check that the URLs can be fetched.")
+        
+        # Set up conversational chain
+        self.setup_conversational_chain(self.vectorstore)
+        
+        # Save system info
+        system_info = {
+            "model": self.model_name,
+            "llm_backend": self.llm_backend,
+            "llm_url": self.llm_url,
+            "embedding_model": self.embedding_model,
+            "embedding_backend": self.embedding_backend,
+            "urls": sorted(self._get_ingested_urls()),
+            "vector_store_path": self.vector_store_path,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "chunk_strategy": self.chunk_strategy,
+            "k_retrieve": self.k_retrieve,
+            "created_at": datetime.now().isoformat(),
+            "document_count": self._build_document_count,
+            "chunk_count": self._build_chunk_count
+        }
+        
+        write_json(system_info, output_file)
+        
+        # Reset totals for the next build
+        self._build_urls = set()
+        self._build_document_count = 0
+        self._build_chunk_count = 0
+        
+        return system_info
+    
+    def build_rag_from_urls(self, urls: List[str], output_file: str = "conversational_rag_system.json",
+                            url_batch_size: int = 64) -> Dict[str, Any]:
         """
         Build RAG system from URLs
         
         Args:
             urls: List of URLs to fetch
             output_file: Output file for system info
+            url_batch_size: Number of URLs fetched and indexed per batch
             
         Returns:
             System information dictionary
@@ -378,34 +1137,11 @@ class ConversationalRAGSystem:
             logger.info(f"Building conversational RAG system from {len(urls)} URLs")
             start_time = time.time()
             
-            # Create documents
-            documents = self.create_documents(urls)
+            # Fetch, split and index URLs batch by batch
+            for batch in batched(urls, url_batch_size):
+                self.add_urls_batch(batch)
             
-            # Split documents
-            split_docs = self.split_documents(documents)
-            
-            # Create vector store
-            self.vectorstore = self.create_vectorstore(split_docs)
-            
-            # Set up conversational chain
-            self.setup_conversational_chain(self.vectorstore)
-            
-            # Save system info
-            system_info = {
-                "model": self.model_name,
-                "embedding_model": self.embedding_model,
-                "urls": urls,
-                "vector_store_path": self.vector_store_path,
-                "chunk_size": self.chunk_size,
-                "chunk_overlap": self.chunk_overlap,
-                "k_retrieve": self.k_retrieve,
-                "created_at": datetime.now().isoformat(),
-                "document_count": len(documents),
-                "chunk_count": len(split_docs)
-            }
-            
-            with open(output_file, 'w') as f:
-                json.dump(system_info, f, indent=2)
+            system_info = self.finalize(output_file)
             
             build_time = time.time() - start_time
             logger.info(f"Conversational RAG system built successfully in {build_time:.2f}s")
@@ -427,17 +1163,25 @@ class ConversationalRAGSystem:
             Session ID
         """
         if session_id is None:
-            session_id = f"session_{int(time.time())}"
+            session_id = f"session_{uuid.uuid4().hex}"
         
         session = ConversationSession(
             session_id=session_id,
-            messages=[],
             created_at=datetime.now(),
             updated_at=datetime.now(),
             metadata={"model": self.model_name}
         )
         
         self.sessions[session_id] = session
+        
+        if self.session_store is not None:
+            self.session_store.upsert_session(
+                session_id,
+                session.created_at.isoformat(),
+                session.updated_at.isoformat(),
+                session.metadata
+            )
+        
         logger.info(f"Created conversation session: {session_id}")
         
         return session_id
@@ -475,6 +1219,8 @@ class ConversationalRAGSystem:
         """
         if session_id in self.sessions:
             del self.sessions[session_id]
+            if self.session_store is not None:
+                self.session_store.delete_session(session_id)
             logger.info(f"Deleted conversation session: {session_id}")
             return True
         return False
@@ -492,24 +1238,25 @@ class ConversationalRAGSystem:
         if session_id not in self.sessions:
             raise ValueError(f"Session {session_id} not found")
         
-        message = ConversationMessage(
-            role=role,
-            content=content,
-            timestamp=datetime.now(),
-            metadata=metadata
-        )
+        session = self.sessions[session_id]
+        now = datetime.now()
+        session.append_message(role, content, now.timestamp(), metadata)
+        session.updated_at = now
         
-        self.sessions[session_id].messages.append(message)
-        self.sessions[session_id].updated_at = datetime.now()
+        if self.session_store is not None:
+            self.session_store.append_message(
+                session_id, role, content, now.isoformat(), metadata
+            )
         
         logger.info(f"Added {role} message to session {session_id}")
     
-    def get_conversation_history(self, session_id: str) -> List[ConversationMessage]:
+    def get_conversation_history(self, session_id: str, limit: Optional[int] = None) -> List[ConversationMessage]:
         """
         Get conversation history for a session
         
         Args:
             session_id: Session ID
+            limit: Only return the most recent limit messages (all if None)
             
         Returns:
             List of conversation messages
@@ -517,15 +1264,90 @@ class ConversationalRAGSystem:
         if session_id not in self.sessions:
             return []
         
-        return self.sessions[session_id].messages.copy()
+        return self.sessions[session_id].recent_messages(limit)
+    
+    def set_session_sources(self, session_id: str, sources: Optional[List[str]]):
+        """
+        Restrict retrieval for a session to chunks from the given source URLs
+        
+        Args:
+            session_id: Session ID
+            sources: Source URLs to search, or None to search all documents
+        """
+        session = self.sessions[session_id]
+        session.metadata = dict(session.metadata or {}, sources=sources)
+        
+        if self.session_store is not None:
+            self.session_store.upsert_session(
+                session_id,
+                session.created_at.isoformat(),
+                session.updated_at.isoformat(),
+                session.metadata
+            )
+    
+    def _set_retriever_filter(self, where: Optional[Dict[str, Any]]):
+        """Set (or clear with None) the metadata filter applied before similarity search"""
+        retriever = self.conversation_chain.retriever
+        if hasattr(retriever, "search_kwargs"):
+            if where is None:
+                retriever.search_kwargs.pop("filter", None)
+            else:
+                retriever.search_kwargs["filter"] = where
+        else:
+            retriever.filter = where
+    
+    def _chat_history(self, session_id: str) -> List[BaseMessage]:
+        """A session's last BATCH_HISTORY_MESSAGES messages as chat messages"""
+        return [
+            HumanMessage(content=message.content) if message.role == "user" else AIMessage(content=message.content)
+            for message in self.sessions[session_id].recent_messages(BATCH_HISTORY_MESSAGES)
+        ]
+    
+    def _cache_embedding(self, session_id: str, question: str) -> List[float]:
+        """
+        Embed a question for the semantic query cache
+        
+        The question's unit vector is blended with the mean of the session's
+        previous CACHE_CONTEXT_TURNS questions, all embedded in one call.
+        
+        Args:
+            session_id: Session the question belongs to
+            question: Question being asked (already added to the session)
+            
+        Returns:
+            Cache key embedding
+        """
+        # Walk back from the newest message, so long sessions cost no more than short ones
+        session = self.sessions[session_id]
+        previous = []
+        for i in range(len(session.roles) - 2, -1, -1):
+            if len(previous) == CACHE_CONTEXT_TURNS:
+                break
+            if session.roles[i] == "user":
+                previous.append(session.contents[i])
+        previous.reverse()
+        
+        vectors = normalize_rows(self.embeddings.embed_documents([question] + previous))
+        if not previous:
+            return vectors[0].tolist()
+        
+        context = vectors[1:].mean(axis=0)
+        blended = (1.0 - CACHE_CONTEXT_WEIGHT) * vectors[0] + CACHE_CONTEXT_WEIGHT * context
+        return blended.tolist()
     
-    def query(self, question: str, session_id: str) -> Dict[str, Any]:
+    def query(self, question: str, session_id: str,
+              on_token: Optional[Callable[[str], None]] = None,
+              sources: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Query the conversational RAG system
         
         Args:
             question: User question
             session_id: Session ID for conversation history
+            on_token: Optional function called with each answer token as it is
+                generated, so callers can show the answer before it is complete
+            sources: Only search chunks from these source URLs (defaults to the
+                session's sources, see set_session_sources)
             
         Returns:
             Response dictionary with answer, sources, and metadata
@@ -543,16 +1365,54 @@ class ConversationalRAGSystem:
             # Add user message to session
             self.add_message(session_id, "user", question)
             
-            # Query the system
-            response = self.conversation_chain({"question": question})
+            if sources is None:
+                sources = (self.sessions[session_id].metadata or {}).get("sources")
             
-            answer = response.get("answer", "")
-            source_documents = response.get("source_documents", [])
+            # Answer repeated questions from the cache when enabled (cached
+            # answers may come from other sources, so not for filtered queries)
+            cached = None
+            if self.query_cache is not None and not sources:
+                query_embedding = self._cache_embedding(session_id, question)
+                cached = self.query_cache.get(query_embedding)
+            
+            if cached is not None:
+                answer = cached["answer"]
+                source_documents = cached["source_documents"]
+                
+                # Keep the chain's memory in step with the conversation
+                self.memory.save_context({"question": question}, {"answer": answer})
+                logger.info("Answered from semantic query cache")
+                if on_token is not None:
+                    on_token(answer)
+            else:
+                config = None
+                if on_token is not None:
+                    config = {"callbacks": [AnswerTokenHandler(on_token, self._answer_chain_name)]}
+                
+                # Pre-filter candidates by source for this call only
+                if sources:
+                    self._set_retriever_filter({"source": {"$in": list(sources)}})
+                try:
+                    # Query the system
+                    response = self.conversation_chain.invoke({"question": question}, config=config)
+                finally:
+                    if sources:
+                        self._set_retriever_filter(None)
+                
+                answer = response.get("answer", "")
+                source_documents = response.get("source_documents", [])
+                
+                if self.query_cache is not None and not sources:
+                    self.query_cache.put(query_embedding, {
+                        "answer": answer,
+                        "source_documents": source_documents
+                    })
             
             # Add assistant message to session
             self.add_message(session_id, "assistant", answer, {
                 "source_documents": len(source_documents),
-                "query_time": time.time() - start_time
+                "query_time": time.time() - start_time,
+                "cached": cached is not None
             })
             
             query_time = time.time() - start_time
@@ -563,13 +1423,154 @@ class ConversationalRAGSystem:
                 "source_documents": source_documents,
                 "query_time": query_time,
                 "session_id": session_id,
-                "message_count": len(self.sessions[session_id].messages)
+                "message_count": self.sessions[session_id].message_count
             }
             
         except Exception as e:
             logger.error(f"Error processing conversational query: {e}")
             raise
     
+    async def aquery_batch(self, items: List[Tuple[str, str]]) -> List[Any]:
+        """
+        Answer several questions concurrently
+        
+        Questions from different sessions are sent to the LLM at once, so an
+        Ollama server started with OLLAMA_NUM_PARALLEL > 1 decodes them
+        together. Each question is condensed against its own session's recent
+        messages rather than the chain's shared memory, and several questions
+        from one session are answered one after another. The retriever's
+        source filter is shared, so sessions restricted to the same sources
+        (see set_session_sources) are answered together, one group at a time.
+        The semantic query cache is not consulted on this path.
+        
+        Args:
+            items: (question, session_id) pairs
+            
+        Returns:
+            Response dictionary for each item in order, or the exception it raised
+        """
+        if self.conversation_chain is None:
+            raise ValueError("Conversational RAG system not built. Run build_rag_from_urls() first.")
+        
+        logger.info(f"Processing batch of {len(items)} conversational queries")
+        start_time = time.time()
+        
+        # Round r holds the r-th question of every session in the batch
+        rounds: List[List[int]] = []
+        per_session: Dict[str, int] = {}
+        for i, (_, session_id) in enumerate(items):
+            if session_id not in self.sessions:
+                self.create_session(session_id)
+            position = per_session.get(session_id, 0)
+            per_session[session_id] = position + 1
+            if position == len(rounds):
+                rounds.append([])
+            rounds[position].append(i)
+        
+        # Chat history is passed in explicitly, so the chain must not load or
+        # save the memory shared by all sessions
+        chain = self.conversation_chain.model_copy(update={"memory": None})
+        
+        results = [None] * len(items)
+        for round_indices in rounds:
+            histories = {}
+            groups: Dict[Tuple[str, ...], List[int]] = {}
+            for i in round_indices:
+                question, session_id = items[i]
+                histories[i] = self._chat_history(session_id)
+                self.add_message(session_id, "user", question)
+                sources = (self.sessions[session_id].metadata or {}).get("sources")
+                groups.setdefault(tuple(sorted(sources or ())), []).append(i)
+            
+            for sources, indices in groups.items():
+                if sources:
+                    self._set_retriever_filter({"source": {"$in": list(sources)}})
+                try:
+                    group_results = await asyncio.gather(
+                        *(chain.ainvoke({"question": items[i][0], "chat_history": histories[i]}) for i in indices),
+                        return_exceptions=True
+                    )
+                finally:
+                    if sources:
+                        self._set_retriever_filter(None)
+                for i, result in zip(indices, group_results):
+                    results[i] = result
+            
+            # Record this round's answers before the session's next question
+            for i in round_indices:
+                if isinstance(results[i], Exception):
+                    logger.error(f"Error processing conversational query: {results[i]}")
+                    continue
+                self.add_message(items[i][1], "assistant", results[i].get("answer", ""), {
+                    "source_documents": len(results[i].get("source_documents", [])),
+                    "query_time": time.time() - start_time,
+                    "batch_size": len(items)
+                })
+        
+        query_time = time.time() - start_time
+        responses = []
+        for (question, session_id), result in zip(items, results):
+            if isinstance(result, Exception):
+                responses.append(result)
+                continue
+            
+            answer = result.get("answer", "")
+            source_documents = result.get("source_documents", [])
+            responses.append({
+                "answer": answer,
+                "source_documents": source_documents,
+                "query_time": query_time,
+                "session_id": session_id,
+                "message_count": self.sessions[session_id].message_count
+            })
+        
+        logger.info(f"Batch of {len(items)} queries processed in {query_time:.2f}s")
+        return responses
+    
+    async def aquery(self, question: str, session_id: str) -> Dict[str, Any]:
+        """
+        Queue a question and wait for its answer
+        
+        Questions arriving within batch_window seconds of each other are
+        answered together by aquery_batch.
+        
+        Args:
+            question: User question
+            session_id: Session ID for conversation history
+            
+        Returns:
+            Response dictionary with answer, sources, and metadata
+        """
+        if self._pending is None:
+            self._pending = asyncio.Queue()
+        if self._batcher is None or self._batcher.done():
+            self._batcher = asyncio.create_task(self._run_batcher())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._pending.put((question, session_id, future))
+        return await future
+    
+    async def _run_batcher(self):
+        """Collect queued questions for batch_window seconds and answer them together"""
+        while True:
+            pending = [await self._pending.get()]
+            await asyncio.sleep(self.batch_window)
+            while not self._pending.empty():
+                pending.append(self._pending.get_nowait())
+            
+            try:
+                results = await self.aquery_batch([(question, session_id) for question, session_id, _ in pending])
+            except Exception as e:
+                results = [e] * len(pending)
+            
+            for (_, _, future), result in zip(pending, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+    
     def get_system_info(self) -> Dict[str, Any]:
         """
         Get system information
@@ -583,10 +1584,60 @@ class ConversationalRAGSystem:
             "vector_store_path": self.vector_store_path,
             "session_count": len(self.sessions),
             "sessions": list(self.sessions.keys()),
-            "memory_type": "ConversationBufferMemory",
+            "memory_type": type(self.memory).__name__,
             "retriever_k": self.k_retrieve
         }
     
+    def _sessions_to_data(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Serialize all sessions into the sessions-file format
+        
+        Returns:
+            Mapping of session ID to serialized session
+        """
+        sessions_data = {}
+        for session_id, session in self.sessions.items():
+            sessions_data[session_id] = {
+                "session_id": session.session_id,
+                "messages": [
+                    {
+                        "role": role,
+                        "content": content,
+                        "timestamp": datetime.fromtimestamp(ts).isoformat(),
+                        "metadata": metadata
+                    }
+                    for role, content, ts, metadata in zip(
+                        session.roles, session.contents, session.timestamps, session.metadatas
+                    )
+                ],
+                "created_at": session.created_at.isoformat(),
+                "updated_at": session.updated_at.isoformat(),
+                "metadata": session.metadata
+            }
+        return sessions_data
+    
+    def _sessions_from_data(self, sessions_data: Dict[str, Dict[str, Any]]):
+        """
+        Replace all sessions with ones deserialized from the sessions-file format
+        
+        Args:
+            sessions_data: Mapping of session ID to serialized session
+        """
+        self.sessions.clear()
+        for session_id, session_data in sessions_data.items():
+            messages = session_data["messages"]
+            session = ConversationSession(
+                session_id=session_data["session_id"],
+                created_at=datetime.fromisoformat(session_data["created_at"]),
+                updated_at=datetime.fromisoformat(session_data["updated_at"]),
+                metadata=session_data.get("metadata"),
+                roles=[msg["role"] for msg in messages],
+                contents=[msg["content"] for msg in messages],
+                timestamps=[datetime.fromisoformat(msg["timestamp"]).timestamp() for msg in messages],
+                metadatas=[msg.get("metadata") for msg in messages]
+            )
+            self.sessions[session_id] = session
+    
     def save_sessions(self, filepath: str):
         """
         Save conversation sessions to file
@@ -595,26 +1646,9 @@ class ConversationalRAGSystem:
             filepath: File path to save sessions
         """
         try:
-            sessions_data = {}
-            for session_id, session in self.sessions.items():
-                sessions_data[session_id] = {
-                    "session_id": session.session_id,
-                    "messages": [
-                        {
-                            "role": msg.role,
-                            "content": msg.content,
-                            "timestamp": msg.timestamp.isoformat(),
-                            "metadata": msg.metadata
-                        }
-                        for msg in session.messages
-                    ],
-                    "created_at": session.created_at.isoformat(),
-                    "updated_at": session.updated_at.isoformat(),
-                    "metadata": session.metadata
-                }
+            sessions_data = self._sessions_to_data()
             
-            with open(filepath, 'w') as f:
-                json.dump(sessions_data, f, indent=2)
+            write_json(sessions_data, filepath)
             
             logger.info(f"Saved {len(self.sessions)} sessions to {filepath}")
             
@@ -630,30 +1664,41 @@ class ConversationalRAGSystem:
             filepath: File path to load sessions from
         """
         try:
-            with open(filepath, 'r') as f:
-                sessions_data = json.load(f)
-            
-            self.sessions.clear()
-            for session_id, session_data in sessions_data.items():
-                session = ConversationSession(
-                    session_id=session_data["session_id"],
-                    messages=[
-                        ConversationMessage(
-                            role=msg["role"],
-                            content=msg["content"],
-                            timestamp=datetime.fromisoformat(msg["timestamp"]),
-                            metadata=msg.get("metadata")
-                        )
-                        for msg in session_data["messages"]
-                    ],
-                    created_at=datetime.fromisoformat(session_data["created_at"]),
-                    updated_at=datetime.fromisoformat(session_data["updated_at"]),
-                    metadata=session_data.get("metadata")
-                )
-                self.sessions[session_id] = session
+            sessions_data = read_json(filepath)
+            
+            self._sessions_from_data(sessions_data)
             
             logger.info(f"Loaded {len(self.sessions)} sessions from {filepath}")
             
         except Exception as e:
             logger.error(f"Error loading sessions: {e}")
             raise
+    
+    def use_session_store(self, db_path: str, legacy_json: Optional[str] = None):
+        """
+        Load sessions from a SQLite database and write all further changes through to it
+        
+        Each new message becomes a single INSERT instead of a full rewrite of the
+        sessions file. An empty database is seeded from the legacy JSON sessions
+        file when one is given and exists.
+        
+        Args:
+            db_path: Path to the SQLite sessions database
+            legacy_json: Optional JSON sessions file to migrate on first use
+        """
+        try:
+            self.session_store = open_store(db_path, legacy_json)
+            
+            self._sessions_from_data(self.session_store.load_sessions())
+            
+            logger.info(f"Loaded {len(self.sessions)} sessions from {db_path}")
+            
+        except Exception as e:
+            logger.error(f"Error opening session store: {e}")
+            raise
+    
+    def close(self):
+        """Release the HTTP connection pool and the session store"""
+        self._http.close()
+        if self.session_store is not None:
+            self.session_store.close()
@@ -0,0 +1,285 @@
+"""
+Embedding Backends
+==================
+
+Embeddings clients that can stand in for HuggingFaceEmbeddings:
+
+- OllamaBatchEmbeddings: an Ollama embedding model, called in batches
+- Model2VecEmbeddings: static model2vec embeddings (no transformer pass)
+- OnnxInt8Embeddings: a sentence-transformers model quantized to INT8 and
+  run with ONNX Runtime
+
+All of them return L2-normalized vectors.
+"""
+
+import os
+import itertools
+import logging
+from typing import Any, Iterable, Iterator, List, Optional
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+def normalize_rows(vectors: Any) -> np.ndarray:
+    """Scale each row vector to unit length (zero rows are left as-is)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+def detect_device() -> str:
+    """
+    Pick the fastest available device for a local embedding model
+    
+    Returns:
+        'cuda', 'mps' or 'cpu'
+    """
+    try:
+        import torch
+    except ImportError:
+        return 'cpu'
+    
+    if torch.cuda.is_available():
+        return 'cuda'
+    if getattr(torch.backends, 'mps', None) is not None and torch.backends.mps.is_available():
+        return 'mps'
+    return 'cpu'
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of at most size items"""
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+class OllamaBatchEmbeddings(Embeddings):
+    """
+    Ollama embeddings that send chunks in batches through the /api/embed endpoint
+    
+    Falls back to one request per chunk on /api/embeddings for Ollama versions
+    that do not support batched input.
+    """
+    
+    def __init__(
+        self,
+        model: str,
+        base_url: Optional[str] = None,
+        batch_size: int = 32,
+        timeout: int = 60
+    ):
+        """
+        Initialize the Ollama embeddings client
+        
+        Args:
+            model: Ollama embedding model name
+            base_url: Ollama server URL (defaults to OLLAMA_BASE_URL or localhost)
+            batch_size: Number of chunks sent per /api/embed request
+            timeout: Request timeout in seconds
+        """
+        self.model = model
+        self.base_url = (base_url or os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')).rstrip('/')
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self._batch_supported = True
+        
+        # Keep-alive session shared by all embedding requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def _embed_sequential(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts one at a time using the legacy /api/embeddings endpoint"""
+        embeddings = []
+        for text in texts:
+            response = self.session.post(
+                f"{self.base_url}/api/embeddings",
+                json={"model": self.model, "prompt": text},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            embeddings.append(response.json()["embedding"])
+        # Unlike /api/embed, the legacy endpoint does not normalize
+        return normalize_rows(embeddings).tolist()
+    
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts with a single /api/embed request"""
+        if not self._batch_supported:
+            return self._embed_sequential(texts)
+        
+        response = self.session.post(
+            f"{self.base_url}/api/embed",
+            json={"model": self.model, "input": texts},
+            timeout=self.timeout
+        )
+        
+        embeddings = None
+        if response.ok:
+            embeddings = response.json().get("embeddings")
+        
+        if not embeddings or len(embeddings) != len(texts):
+            logger.warning("Batched /api/embed unavailable, falling back to sequential /api/embeddings")
+            self._batch_supported = False
+            return self._embed_sequential(texts)
+        
+        return embeddings
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of documents in batches
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List of embedding vectors
+        """
+        embeddings = []
+        for i in range(0, len(texts), self.batch_size):
+            embeddings.extend(self._embed_batch(texts[i:i + self.batch_size]))
+        return embeddings
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding vector
+        """
+        return self._embed_batch([text])[0]
+
+class Model2VecEmbeddings(Embeddings):
+    """
+    Static (distilled) embeddings from model2vec
+    
+    Embedding is a token-to-vector lookup plus mean pooling, with no transformer
+    forward pass, trading a little quality for much faster indexing.
+    """
+    
+    def __init__(self, model: str = "minishlab/potion-base-8M", batch_size: int = 4096):
+        """
+        Load the model2vec model
+        
+        Args:
+            model: model2vec model name on HuggingFace
+            batch_size: Number of texts encoded per batch
+        """
+        from model2vec import StaticModel
+        
+        self.model = StaticModel.from_pretrained(model)
+        self.batch_size = batch_size
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of documents
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List of embedding vectors
+        """
+        return normalize_rows(self.model.encode(texts, batch_size=self.batch_size)).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding vector
+        """
+        return normalize_rows(self.model.encode([text]))[0].tolist()
+
+class OnnxInt8Embeddings(Embeddings):
+    """
+    Sentence-transformers model quantized to INT8 and run with ONNX Runtime
+    
+    The model is exported, graph-optimized and dynamically quantized once into
+    cache_dir; later runs load the quantized copy directly.
+    """
+    
+    def __init__(self, model: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 cache_dir: str = os.path.expanduser("~/.cache/langgraph_adv/onnx"),
+                 batch_size: int = 256):
+        """
+        Load (quantizing on first use) the INT8 ONNX model
+        
+        Args:
+            model: HuggingFace sentence-transformers model ID
+            cache_dir: Directory holding quantized models
+            batch_size: Number of texts encoded per forward pass
+        """
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTOptimizer, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig, OptimizationConfig
+        from transformers import AutoTokenizer
+        
+        model_dir = os.path.join(cache_dir, model.replace('/', '--') + "-opt-int8")
+        if not os.path.isdir(model_dir):
+            logger.info(f"Optimizing and quantizing {model} to INT8 in {model_dir}")
+            fp32_model = ORTModelForFeatureExtraction.from_pretrained(model, export=True)
+            
+            # Fuse attention, LayerNorm and GELU subgraphs before quantizing;
+            # level 2 keeps the graph portable across CPUs (99 adds layout
+            # changes tied to the exporting machine)
+            optimizer = ORTOptimizer.from_pretrained(fp32_model)
+            optimizer.optimize(
+                save_dir=model_dir,
+                optimization_config=OptimizationConfig(optimization_level=2, optimize_for_gpu=False)
+            )
+            
+            quantizer = ORTQuantizer.from_pretrained(model_dir, file_name="model_optimized.onnx")
+            quantizer.quantize(
+                save_dir=model_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            )
+            AutoTokenizer.from_pretrained(model).save_pretrained(model_dir)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_dir, file_name="model_optimized_quantized.onnx")
+        self.batch_size = batch_size
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Mean-pool token embeddings and L2-normalize them"""
+        vectors = []
+        for batch in batched(texts, self.batch_size):
+            inputs = self.tokenizer(batch, padding=True, truncation=True, return_tensors="np")
+            token_embeddings = self.model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            vectors.append(normalize_rows(pooled))
+        return np.vstack(vectors)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of documents
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List of embedding vectors
+        """
+        if not texts:
+            return []
+        return self._encode(texts).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding vector
+        """
+        return self._encode([text])[0].tolist()
@@ -0,0 +1,114 @@
+"""
+Persistent Embedding Cache
+==========================
+
+Wraps an embeddings client so that document chunks which were embedded
+before (same text, same model) are read back from a SQLite table instead of
+being run through the model again. Re-ingesting unchanged pages then costs
+only a hash and a lookup per chunk. Document vectors are kept at float16
+precision.
+"""
+
+import hashlib
+import sqlite3
+from typing import List
+
+import numpy as np
+
+from langchain_core.embeddings import Embeddings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings_fp16 (
+    namespace TEXT NOT NULL,
+    key BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+"""
+
+# SQLite's default limit on host parameters in one statement is 999
+LOOKUP_BATCH = 500
+
+# Vectors are stored as float16: half the size of float32, and the rounding
+# error (~1e-3 relative) does not change cosine rankings in practice
+STORAGE_DTYPE = np.float16
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings proxy that caches document vectors by content hash, as float16
+    """
+
+    def __init__(self, underlying: Embeddings, db_path: str, namespace: str):
+        """
+        Open (and create if needed) the embedding cache
+
+        Args:
+            underlying: Embeddings client used for cache misses
+            db_path: Path to the SQLite database file
+            namespace: Cache namespace, normally the embedding model name
+        """
+        self.underlying = underlying
+        self.namespace = namespace
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        """Hash a chunk's text into its cache key"""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, computing only the ones missing from the cache
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One embedding per text
+        """
+        keys = [self._key(text) for text in texts]
+
+        cached = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), LOOKUP_BATCH):
+            batch = unique_keys[start:start + LOOKUP_BATCH]
+            placeholders = ", ".join("?" * len(batch))
+            for key, vector in self.conn.execute(
+                f"SELECT key, vector FROM embeddings_fp16 WHERE namespace = ? AND key IN ({placeholders})",
+                [self.namespace, *batch]
+            ):
+                cached[key] = np.frombuffer(vector, dtype=STORAGE_DTYPE).astype(np.float32).tolist()
+
+        # Embed each missing text once, even if it appears several times
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = np.asarray(self.underlying.embed_documents(list(missing.values())), dtype=STORAGE_DTYPE)
+            rows = []
+            for key, vector in zip(missing, vectors):
+                # Return the stored precision so fresh and cached vectors match
+                cached[key] = vector.astype(np.float32).tolist()
+                rows.append((self.namespace, key, vector.tobytes()))
+            with self.conn:
+                self.conn.execute("BEGIN")
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings_fp16 (namespace, key, vector) VALUES (?, ?, ?)",
+                    rows
+                )
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query (queries are not cached)"""
+        return self.underlying.embed_query(text)
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
@@ -0,0 +1,100 @@
+"""
+Semantic Query Cache
+====================
+
+Caches query responses keyed by the query embedding, so a question that is
+nearly identical to one answered before (cosine similarity above a threshold)
+is served without running retrieval and generation again.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticQueryCache:
+    """
+    LRU cache of query responses looked up by query-embedding similarity
+    
+    Entries live in fixed slots of a preallocated matrix of unit vectors, so a
+    lookup is one matrix-vector product over the cached queries.
+    """
+    
+    def __init__(self, threshold: float = 0.97, max_entries: int = 1024, ttl: Optional[float] = None):
+        """
+        Create an empty cache
+        
+        Args:
+            threshold: Minimum cosine similarity for a cache hit
+            max_entries: Maximum cached queries before the least recently used is evicted
+            ttl: Seconds an entry stays valid (None for no expiry)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._vectors: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Convert an embedding to a float32 unit vector"""
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+    
+    def get(self, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        Look up the response of the most similar cached query
+        
+        Args:
+            embedding: Query embedding
+            
+        Returns:
+            Cached response, or None on a miss
+        """
+        if not self._entries:
+            return None
+        
+        sims = self._vectors @ self._normalize(embedding)
+        sims[~self._valid] = -np.inf
+        slot = int(np.argmax(sims))
+        if sims[slot] < self.threshold:
+            return None
+        
+        created_at, response = self._entries[slot]
+        if self.ttl is not None and time.time() - created_at > self.ttl:
+            del self._entries[slot]
+            self._valid[slot] = False
+            return None
+        
+        self._entries.move_to_end(slot)
+        return response
+    
+    def put(self, embedding: List[float], response: Dict[str, Any]):
+        """
+        Cache a response, evicting the least recently used entry when full
+        
+        Args:
+            embedding: Query embedding
+            response: Response to cache
+        """
+        vec = self._normalize(embedding)
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vec.shape[0]), dtype=np.float32)
+        
+        if len(self._entries) < self.max_entries:
+            slot = int(np.argmin(self._valid))
+        else:
+            slot, _ = self._entries.popitem(last=False)
+        
+        self._vectors[slot] = vec
+        self._valid[slot] = True
+        self._entries[slot] = (time.time(), response)
+    
+    def clear(self):
+        """Drop all cached entries"""
+        self._valid[:] = False
+        self._entries.clear()
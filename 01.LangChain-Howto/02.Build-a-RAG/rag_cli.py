@@ -13,13 +13,11 @@ import sys
 import json
 import click
 from typing import List
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from dotenv import load_dotenv
 
-from rag_system import RAGSystem
+# Rich console for output (other Rich components and the RAG system are
+# imported inside the commands that need them to keep CLI start-up fast)
+from rich.console import Console
 
 # Load environment variables
 load_dotenv()
@@ -27,6 +25,20 @@ load_dotenv()
 # Initialize Rich console
 console = Console()
 
+def fetch_ollama_models() -> List[dict]:
+    """
+    Fetch the locally available models from the Ollama HTTP API
+    
+    Returns:
+        Model entries from /api/tags
+    """
+    import requests
+    
+    base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434').rstrip('/')
+    response = requests.get(f"{base_url}/api/tags", timeout=2)
+    response.raise_for_status()
+    return response.json().get('models', [])
+
 @click.group()
 @click.version_option(version="1.0.0")
 def cli():
@@ -73,6 +85,10 @@ def build(urls: tuple, urls_file: str, model: str, output: str):
     console.print(f"[green]Building RAG system from {len(all_urls)} URLs...[/green]")
     
     try:
+        from rag_system import RAGSystem
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+        from rich.table import Table
+        
         # Initialize RAG system
         with Progress(
             SpinnerColumn(),
@@ -94,7 +110,7 @@ def build(urls: tuple, urls_file: str, model: str, output: str):
             'model': rag.model_name,
             'urls': all_urls,
             'vectorstore_path': './chroma_db',
-            'embedding_model': os.getenv('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+            'embedding_model': rag.embedding_model
         }
         
         with open(output, 'w') as f:
@@ -124,7 +140,9 @@ def build(urls: tuple, urls_file: str, model: str, output: str):
 @click.option('--model', '-m', default=None, help='Ollama model to use')
 @click.option('--system-info', '-s', default='rag_system.json', help='System info file')
 @click.option('--interactive', '-i', is_flag=True, help='Run in interactive mode')
-def query(question: str, model: str, system_info: str, interactive: bool):
+@click.option('--semantic-cache', is_flag=True,
+              help='Answer near-identical repeated questions from a cache')
+def query(question: str, model: str, system_info: str, interactive: bool, semantic_cache: bool):
     """Query the RAG system"""
     
     # Handle case where no question is provided and not in interactive mode
@@ -146,29 +164,22 @@ def query(question: str, model: str, system_info: str, interactive: bool):
             console.print(f"[yellow]Warning: System info file not found: {system_info}[/yellow]")
             info = {}
         
-        # Initialize RAG system
-        rag = RAGSystem(model_name=model or info.get('model'))
+        from rag_system import RAGSystem
+        from rich.progress import Progress, SpinnerColumn, TextColumn
         
         # Check if vector store exists
-        if not os.path.exists('./chroma_db'):
+        vectorstore_path = info.get('vectorstore_path', './chroma_db')
+        if not os.path.exists(vectorstore_path):
             console.print("[red]Error: Vector store not found. Please build the RAG system first.[/red]")
             sys.exit(1)
         
-        # Load existing vector store
-        from langchain_community.vectorstores import Chroma
-        from langchain_community.embeddings import HuggingFaceEmbeddings
-        
-        embeddings = HuggingFaceEmbeddings(
-            model_name=info.get('embedding_model', 'sentence-transformers/all-MiniLM-L6-v2')
+        # Initialize RAG system and load the existing vector store with its embeddings
+        rag = RAGSystem(
+            model_name=model or info.get('model'),
+            semantic_cache=semantic_cache,
+            embedding_model=info.get('embedding_model')
         )
-        
-        vectorstore = Chroma(
-            persist_directory="./chroma_db",
-            embedding_function=embeddings
-        )
-        
-        rag.vectorstore = vectorstore
-        rag.setup_retrieval_qa(vectorstore)
+        rag.load_vectorstore(vectorstore_path)
         
         if interactive:
             console.print("[green]Interactive mode started. Type 'quit' to exit.[/green]")
@@ -185,17 +196,16 @@ def query(question: str, model: str, system_info: str, interactive: bool):
                     if not user_question:
                         continue
                     
-                    # Process question
-                    with Progress(
-                        SpinnerColumn(),
-                        TextColumn("[progress.description]{task.description}"),
-                        console=console
-                    ) as progress:
-                        task = progress.add_task("Processing question...", total=None)
-                        result = rag.query(user_question)
+                    # Stream the answer as it is generated
+                    console.print("\n[bold green]Answer:[/bold green] ", end="")
+                    result = rag.query(
+                        user_question,
+                        on_token=lambda token: console.print(token, end="", markup=False, highlight=False)
+                    )
+                    console.print()
                     
-                    # Display result
-                    display_result(user_question, result)
+                    # Display metrics and sources
+                    display_result(user_question, result, show_answer=False)
                     
                 except KeyboardInterrupt:
                     console.print("\n[green]Goodbye![/green]")
@@ -218,16 +228,18 @@ def query(question: str, model: str, system_info: str, interactive: bool):
         console.print(f"[red]Error: {e}[/red]")
         sys.exit(1)
 
-def display_result(question: str, result: dict):
-    """Display query result in a formatted way"""
+def display_result(question: str, result: dict, show_answer: bool = True):
+    """Display query result in a formatted way (show_answer=False when it was streamed)"""
+    from rich.panel import Panel
     
     # Create answer panel
-    answer_panel = Panel(
-        result['answer'],
-        title="[bold green]Answer[/bold green]",
-        border_style="green"
-    )
-    console.print(answer_panel)
+    if show_answer:
+        answer_panel = Panel(
+            result['answer'],
+            title="[bold green]Answer[/bold green]",
+            border_style="green"
+        )
+        console.print(answer_panel)
     
     # Create metrics panel
     metrics_panel = Panel(
@@ -273,6 +285,9 @@ def test(model: str):
     ]
     
     try:
+        from rag_system import RAGSystem
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+        
         # Initialize and build RAG system
         with Progress(
             SpinnerColumn(),
@@ -286,11 +301,8 @@ def test(model: str):
             
             progress.update(task, description="Testing with sample questions...")
         
-        # Test questions
-        results = []
-        for question in questions:
-            result = rag.query(question)
-            results.append((question, result))
+        # Test questions (answered as one concurrent batch)
+        results = list(zip(questions, rag.query_batch(questions)))
         
         # Display results
         console.print("\n[bold green]Test Results:[/bold green]")
@@ -310,21 +322,27 @@ def list_models():
     """List available Ollama models"""
     
     try:
-        import subprocess
+        import requests
+        from rich.table import Table
         
         console.print("[green]Fetching available Ollama models...[/green]")
         
-        result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
+        models = fetch_ollama_models()
         
-        if result.returncode == 0:
-            console.print("[bold green]Available Models:[/bold green]")
-            console.print(result.stdout)
-        else:
-            console.print("[red]Error: Could not fetch Ollama models[/red]")
-            console.print(f"Error: {result.stderr}")
+        table = Table(title="Available Models")
+        table.add_column("Name", style="cyan")
+        table.add_column("Size", style="green", justify="right")
+        table.add_column("Modified", style="blue")
+        for entry in models:
+            table.add_row(
+                entry.get('name', ''),
+                f"{entry.get('size', 0) / 1e9:.1f} GB",
+                entry.get('modified_at', '')[:19].replace('T', ' ')
+            )
+        console.print(table)
             
-    except FileNotFoundError:
-        console.print("[red]Error: Ollama not found. Please install Ollama first.[/red]")
+    except requests.ConnectionError:
+        console.print("[red]Error: Could not reach Ollama. Is it installed and running?[/red]")
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
 
@@ -339,6 +357,8 @@ def status():
         with open('rag_system.json', 'r') as f:
             info = json.load(f)
         
+        from rich.table import Table
+        
         console.print("[bold green]System Info:[/bold green]")
         table = Table()
         table.add_column("Property", style="cyan")
@@ -359,14 +379,10 @@ def status():
     
     # Check Ollama
     try:
-        import subprocess
-        result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-        if result.returncode == 0:
-            console.print("[green]✓ Ollama is running[/green]")
-        else:
-            console.print("[red]✗ Ollama is not running[/red]")
-    except FileNotFoundError:
-        console.print("[red]✗ Ollama not installed[/red]")
+        fetch_ollama_models()
+        console.print("[green]✓ Ollama is running[/green]")
+    except Exception:
+        console.print("[red]✗ Ollama is not running[/red]")
 
 if __name__ == "__main__":
     cli()
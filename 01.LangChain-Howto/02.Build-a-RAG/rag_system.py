@@ -12,11 +12,18 @@ Date: 2024
 """
 
 import os
+import asyncio
+import hashlib
 import logging
 import time
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
@@ -25,10 +32,39 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
 from langchain.schema import Document
-from langchain.prompts import PromptTemplate
-from langchain.chains import RetrievalQA
 from langgraph.graph import StateGraph, END
 from langchain.tools import tool
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseLanguageModel
+
+from embedding_backends import OnnxInt8Embeddings, detect_device
+from embedding_cache import CachedEmbeddings
+from query_cache import SemanticQueryCache
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        # selectolax < 0.3 only ships the Modest backend
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml  # noqa: F401  (only used as a BeautifulSoup backend)
+    BS4_PARSER = 'lxml'
+except ImportError:
+    BS4_PARSER = 'html.parser'
 
 # Load environment variables
 load_dotenv()
@@ -44,24 +80,120 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# How long Ollama keeps the model loaded between requests. While it stays
+# resident, a prompt that starts with the previous prompt's tokens (the fixed
+# instructions and, for recurring retrievals, the same context chunks) reuses
+# their KV cache instead of re-processing them.
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
+
+# HNSW index settings for new Chroma collections: larger graph degree and
+# build/search beam widths than Chroma's defaults for better recall on large
+# collections. Stored embeddings are unit vectors, so inner product ranks like
+# cosine. Only applied when a collection is created.
+HNSW_METADATA = {
+    "hnsw:space": "ip",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+}
+
+# Common typos in domain names and their corrections
+_DOMAIN_FIXES = {
+    'github.ioposts': 'github.io/posts',
+}
+
+# Maximum simultaneous connections when fetching URLs concurrently, in
+# total and per host, so large URL lists don't flood a single site
+FETCH_CONCURRENCY = int(os.getenv('FETCH_CONCURRENCY', '10'))
+FETCH_CONCURRENCY_PER_HOST = 4
+
+# Corpora with less text than this are split in-process; below it, starting
+# worker processes costs more than the splitting itself
+PARALLEL_SPLIT_MIN_CHARS = 2_000_000
+
+def _run_in_new_loop(coroutine):
+    """Run a coroutine on a new event loop, uvloop's faster one when installed"""
+    if uvloop is not None:
+        return uvloop.run(coroutine)
+    return asyncio.run(coroutine)
+
+def run_async(coroutine):
+    """
+    Run a coroutine to completion from synchronous code
+    
+    When the calling thread already runs an event loop (Jupyter, async
+    callers), a second loop cannot be started on it, so the coroutine runs
+    on a new loop in a worker thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _run_in_new_loop(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_run_in_new_loop, coroutine).result()
+
+def _split_one(document: Document, chunk_size: int, chunk_overlap: int) -> List[Document]:
+    """Split a single document (module-level so worker processes can run it)"""
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]
+    )
+    return text_splitter.split_documents([document])
+
+class TokenHandler(BaseCallbackHandler):
+    """
+    Callback handler that forwards streamed LLM tokens to a function
+    """
+    
+    def __init__(self, on_token: Callable[[str], None]):
+        """
+        Args:
+            on_token: Function called with each generated token
+        """
+        self.on_token = on_token
+    
+    def on_llm_new_token(self, token: str, **kwargs):
+        """Forward each token as it arrives"""
+        self.on_token(token)
+
 class RAGSystem:
     """
     A Retrieval-Augmented Generation system using LangGraph and Ollama
     """
     
-    def __init__(self, model_name: str = None):
+    # Prompt for answering from retrieved context; fixed instructions come
+    # first so consecutive prompts share a prefix
+    QA_PROMPT = (
+        "Use the following pieces of context to answer the question at the end.\n"
+        "If you don't know the answer, just say that you don't know, don't try to make up an answer.\n"
+        "\n"
+        "Context: {context}\n"
+        "\n"
+        "Question: {question}\n"
+        "\n"
+        "Answer:"
+    )
+    
+    def __init__(self, model_name: str = None, semantic_cache: bool = False, embedding_model: str = None,
+                 llm: Optional[BaseLanguageModel] = None):
         """
         Initialize the RAG system
         
         Args:
             model_name: Name of the Ollama model to use
+            semantic_cache: Answer near-identical repeated questions from a cache
+            embedding_model: Embedding model (defaults to EMBEDDING_MODEL)
+            llm: Ready-made language model to use instead of Ollama (e.g. a fake LLM in tests)
         """
         self.model_name = model_name or os.getenv('OLLAMA_MODEL', 'llama3.1:8b-instruct-q8_0')
-        self.llm = None
+        self.embedding_model = embedding_model or os.getenv('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+        self.llm = llm
         self.embeddings = None
         self.vectorstore = None
         self.retriever = None
-        self.qa_chain = None
+        self.query_cache = SemanticQueryCache(threshold=0.95, ttl=3600) if semantic_cache else None
         
         # Initialize components
         self._initialize_components()
@@ -71,16 +203,51 @@ class RAGSystem:
         try:
             logger.info("Initializing RAG system components...")
             
-            # Initialize Ollama LLM
-            self.llm = OllamaLLM(
-                model=self.model_name,
-                temperature=float(os.getenv('TEMPERATURE', '0.1')),
-                max_tokens=int(os.getenv('MAX_TOKENS', '4096'))
-            )
+            # Initialize Ollama LLM unless one was supplied
+            if self.llm is None:
+                self.llm = OllamaLLM(
+                    model=self.model_name,
+                    temperature=float(os.getenv('TEMPERATURE', '0.1')),
+                    max_tokens=int(os.getenv('MAX_TOKENS', '4096')),
+                    keep_alive=OLLAMA_KEEP_ALIVE
+                )
             
             # Initialize embeddings
-            embedding_model = os.getenv('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
-            self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model)
+            embedding_model = self.embedding_model
+            embedding_backend = os.getenv('EMBEDDING_BACKEND', 'huggingface')
+            emb_batch = int(os.getenv('EMB_BATCH', '64'))
+            
+            if embedding_backend == 'onnx-int8':
+                # INT8-quantized ONNX Runtime copy of the model, for CPU-only hosts
+                encoder = OnnxInt8Embeddings(model=embedding_model, batch_size=emb_batch)
+            else:
+                encoder = HuggingFaceEmbeddings(
+                    model_name=embedding_model,
+                    model_kwargs={'device': detect_device()},
+                    # Batches are padded to their longest chunk; CHUNK_SIZE bounds that length
+                    encode_kwargs={
+                        'batch_size': emb_batch,
+                        'normalize_embeddings': True
+                    }
+                )
+            
+            # Chunks embedded by an earlier build are read back instead of re-encoded
+            self.embeddings = CachedEmbeddings(
+                encoder,
+                db_path=os.getenv('EMBEDDING_CACHE', './emb_cache.db'),
+                namespace=f"{embedding_backend}:{embedding_model}"
+            )
+            
+            # Keep-alive session so URLs on the same host reuse TCP/TLS connections
+            # (requests already negotiates gzip/deflate, and br when brotli is installed)
+            self._http = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=32,
+                max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+            )
+            self._http.mount("https://", adapter)
+            self._http.mount("http://", adapter)
             
             logger.info(f"RAG system initialized with model: {self.model_name}")
             
@@ -104,15 +271,15 @@ class RAGSystem:
                 url = 'https://' + url
             
             # Parse URL to check for common issues
-            from urllib.parse import urlparse
             parsed = urlparse(url)
             
             # Check for common typos in domain names
             domain = parsed.netloc.lower()
-            if 'github.ioposts' in domain:
-                domain = domain.replace('github.ioposts', 'github.io/posts')
-                url = f"{parsed.scheme}://{domain}{parsed.path}"
-                logger.info(f"Fixed URL typo: {url}")
+            for typo, fix in _DOMAIN_FIXES.items():
+                if typo in domain:
+                    domain = domain.replace(typo, fix)
+                    url = f"{parsed.scheme}://{domain}{parsed.path}"
+                    logger.info(f"Fixed URL typo: {url}")
             
             return url
             
@@ -120,6 +287,37 @@ class RAGSystem:
             logger.error(f"Error validating URL {url}: {e}")
             raise
     
+    def extract_text(self, content: bytes) -> str:
+        """
+        Extract readable text from an HTML page
+        
+        Uses the selectolax C parser when available, otherwise BeautifulSoup
+        (with lxml if installed).
+        
+        Args:
+            content: Raw HTML content
+            
+        Returns:
+            Cleaned text content
+        """
+        if HTMLParser is not None:
+            tree = HTMLParser(content)
+            
+            # Remove script and style elements
+            for node in tree.css("script, style"):
+                node.decompose()
+            
+            root = tree.body or tree.root
+            text = root.text(separator=" ") if root is not None else ""
+        else:
+            soup = BeautifulSoup(content, BS4_PARSER)
+            for script in soup(["script", "style"]):
+                script.decompose()
+            text = soup.get_text()
+        
+        # Collapse whitespace runs in one C-level pass
+        return " ".join(text.split())
+    
     def fetch_url_content(self, url: str) -> str:
         """
         Fetch content from a URL
@@ -137,22 +335,41 @@ class RAGSystem:
             logger.info(f"Fetching content from: {url}")
             start_time = time.time()
             
-            response = requests.get(url, timeout=30)
+            response = self._http.get(url, timeout=30)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            text = self.extract_text(response.content)
             
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+            fetch_time = time.time() - start_time
+            logger.info(f"Fetched content in {fetch_time:.2f}s, length: {len(text)} characters")
             
-            # Extract text
-            text = soup.get_text()
+            return text
             
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
+        except Exception as e:
+            logger.error(f"Error fetching content from {url}: {e}")
+            raise
+    
+    async def _afetch(self, session: "aiohttp.ClientSession", url: str) -> str:
+        """
+        Fetch and extract the content of a single, already validated URL
+        
+        Args:
+            session: Shared aiohttp session
+            url: URL to fetch content from
+            
+        Returns:
+            Extracted text content from the URL
+        """
+        try:
+            logger.info(f"Fetching content from: {url}")
+            start_time = time.time()
+            
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                response.raise_for_status()
+                content = await response.read()
+            
+            # Parse off the event loop so other downloads keep progressing
+            text = await asyncio.to_thread(self.extract_text, content)
             
             fetch_time = time.time() - start_time
             logger.info(f"Fetched content in {fetch_time:.2f}s, length: {len(text)} characters")
@@ -163,6 +380,50 @@ class RAGSystem:
             logger.error(f"Error fetching content from {url}: {e}")
             raise
     
+    async def _fetch_all(self, urls: List[str]) -> List[str]:
+        """
+        Fetch all URLs concurrently over one HTTP session
+        
+        Args:
+            urls: Validated URLs to fetch
+            
+        Returns:
+            Extracted text contents, in the same order as urls
+        """
+        connector = aiohttp.TCPConnector(
+            limit=FETCH_CONCURRENCY,
+            limit_per_host=FETCH_CONCURRENCY_PER_HOST,
+            ttl_dns_cache=300
+        )
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(*[self._afetch(session, url) for url in urls])
+    
+    def drop_duplicate_pages(self, texts: List[str], urls: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Keep only the first URL for each distinct page text
+        
+        Different URLs can serve the same page (mirrors, redirects, trailing-slash
+        variants); only one copy needs to be split and embedded.
+        
+        Args:
+            texts: List of extracted page texts
+            urls: List of corresponding URLs
+            
+        Returns:
+            Tuple of (texts, urls) without duplicate pages
+        """
+        seen = set()
+        unique_texts, unique_urls = [], []
+        for text, url in zip(texts, urls):
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+            if digest in seen:
+                logger.info(f"Skipping {url}: same content as an earlier URL")
+                continue
+            seen.add(digest)
+            unique_texts.append(text)
+            unique_urls.append(url)
+        return unique_texts, unique_urls
+    
     def create_documents(self, texts: List[str], urls: List[str]) -> List[Document]:
         """
         Create Document objects from texts and URLs
@@ -174,12 +435,15 @@ class RAGSystem:
         Returns:
             List of Document objects
         """
+        # Parse each distinct URL once
+        netlocs = {url: urlparse(url).netloc for url in set(urls)}
+        
         documents = []
         for text, url in zip(texts, urls):
             # Create metadata
             metadata = {
                 'source': url,
-                'domain': urlparse(url).netloc,
+                'domain': netlocs[url],
                 'length': len(text)
             }
             
@@ -190,6 +454,22 @@ class RAGSystem:
         logger.info(f"Created {len(documents)} documents")
         return documents
     
+    def index_settings(self) -> Dict[str, Any]:
+        """
+        Settings that determine the chunks and vectors of a built vector store
+        
+        A store can only be reloaded by a system with the same settings.
+        
+        Returns:
+            Embedding model and backend, chunk size and overlap
+        """
+        return {
+            "embedding_model": self.embedding_model,
+            "embedding_backend": os.getenv('EMBEDDING_BACKEND', 'huggingface'),
+            "chunk_size": int(os.getenv('CHUNK_SIZE', '1000')),
+            "chunk_overlap": int(os.getenv('CHUNK_OVERLAP', '200'))
+        }
+    
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """
         Split documents into smaller chunks for better retrieval
@@ -201,17 +481,17 @@ class RAGSystem:
             List of split Document objects
         """
         try:
-            chunk_size = int(os.getenv('CHUNK_SIZE', '1000'))
-            chunk_overlap = int(os.getenv('CHUNK_OVERLAP', '200'))
-            
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-                length_function=len,
-                separators=["\n\n", "\n", " ", ""]
-            )
-            
-            split_docs = text_splitter.split_documents(documents)
+            settings = self.index_settings()
+            split_one = partial(_split_one, chunk_size=settings["chunk_size"], chunk_overlap=settings["chunk_overlap"])
+            
+            # Documents split independently, so large corpora use every core
+            workers = int(os.getenv('SPLIT_WORKERS', str(os.cpu_count() or 1)))
+            total_chars = sum(len(doc.page_content) for doc in documents)
+            if workers > 1 and len(documents) > 1 and total_chars >= PARALLEL_SPLIT_MIN_CHARS:
+                with ProcessPoolExecutor(max_workers=min(workers, len(documents))) as executor:
+                    split_docs = list(chain.from_iterable(executor.map(split_one, documents)))
+            else:
+                split_docs = list(chain.from_iterable(map(split_one, documents)))
             logger.info(f"Split {len(documents)} documents into {len(split_docs)} chunks")
             
             return split_docs
@@ -220,12 +500,13 @@ class RAGSystem:
             logger.error(f"Error splitting documents: {e}")
             raise
     
-    def create_vectorstore(self, documents: List[Document]) -> Chroma:
+    def create_vectorstore(self, documents: List[Document], persist_directory: str = "./chroma_db") -> Chroma:
         """
         Create a vector store from documents
         
         Args:
             documents: List of Document objects
+            persist_directory: Directory to persist the Chroma store in
             
         Returns:
             Chroma vector store
@@ -234,16 +515,18 @@ class RAGSystem:
             logger.info("Creating vector store...")
             start_time = time.time()
             
-            # Create vector store
+            # Sort chunks by length so each embedding batch holds similarly sized
+            # texts (less padding); Chroma embeds all chunks in one call
+            documents = sorted(documents, key=lambda doc: len(doc.page_content))
+            
+            # Create vector store (Chroma >= 0.4 writes to persist_directory as it goes)
             vectorstore = Chroma.from_documents(
                 documents=documents,
                 embedding=self.embeddings,
-                persist_directory="./chroma_db"
+                persist_directory=persist_directory,
+                collection_metadata=HNSW_METADATA
             )
             
-            # Persist the vector store
-            vectorstore.persist()
-            
             creation_time = time.time() - start_time
             logger.info(f"Vector store created in {creation_time:.2f}s")
             
@@ -253,9 +536,28 @@ class RAGSystem:
             logger.error(f"Error creating vector store: {e}")
             raise
     
+    def load_vectorstore(self, persist_directory: str = "./chroma_db"):
+        """
+        Load a persisted vector store and set up the retrieval QA chain on it
+        
+        Args:
+            persist_directory: Directory of the persisted Chroma store
+        """
+        try:
+            logger.info(f"Loading vector store from: {persist_directory}")
+            self.vectorstore = Chroma(
+                persist_directory=persist_directory,
+                embedding_function=self.embeddings
+            )
+            self.setup_retrieval_qa(self.vectorstore)
+            
+        except Exception as e:
+            logger.error(f"Error loading vector store: {e}")
+            raise
+    
     def setup_retrieval_qa(self, vectorstore: Chroma):
         """
-        Set up the retrieval QA chain
+        Set up retrieval for question answering
         
         Args:
             vectorstore: Chroma vector store
@@ -267,52 +569,52 @@ class RAGSystem:
                 search_kwargs={"k": 4}
             )
             
-            # Create prompt template
-            prompt_template = """Use the following pieces of context to answer the question at the end. 
-            If you don't know the answer, just say that you don't know, don't try to make up an answer.
-            
-            Context: {context}
-            
-            Question: {question}
-            
-            Answer:"""
-            
-            prompt = PromptTemplate(
-                template=prompt_template,
-                input_variables=["context", "question"]
-            )
-            
-            # Create QA chain
-            self.qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=self.retriever,
-                return_source_documents=True,
-                chain_type_kwargs={"prompt": prompt}
-            )
+            # Answers cached against a previous vector store are stale
+            if self.query_cache is not None:
+                self.query_cache.clear()
             
-            logger.info("Retrieval QA chain set up successfully")
+            logger.info("Retrieval QA set up successfully")
             
         except Exception as e:
             logger.error(f"Error setting up retrieval QA: {e}")
             raise
     
-    def build_rag_from_urls(self, urls: List[str]):
+    def build_prompt(self, question: str, documents: List[Document]) -> str:
+        """
+        Fill the QA prompt with retrieved documents
+        
+        Args:
+            question: User's question
+            documents: Retrieved documents
+            
+        Returns:
+            Prompt for the LLM
+        """
+        context = "\n\n".join(doc.page_content for doc in documents)
+        return self.QA_PROMPT.format(context=context, question=question)
+    
+    def build_rag_from_urls(self, urls: List[str], persist_directory: str = "./chroma_db"):
         """
         Build the RAG system from a list of URLs
         
         Args:
             urls: List of URLs to fetch and process
+            persist_directory: Directory to persist the Chroma store in
         """
         try:
             logger.info(f"Building RAG system from {len(urls)} URLs")
             start_time = time.time()
             
-            # Fetch content from URLs
-            texts = []
-            for url in urls:
-                text = self.fetch_url_content(url)
-                texts.append(text)
+            # Normalize URLs and drop duplicates before any network work
+            urls = list(dict.fromkeys(self.validate_url(url) for url in urls))
+            
+            # Fetch content from URLs, concurrently when aiohttp is available
+            if aiohttp is not None:
+                texts = run_async(self._fetch_all(urls))
+            else:
+                texts = [self.fetch_url_content(url) for url in urls]
+            
+            texts, urls = self.drop_duplicate_pages(texts, urls)
             
             # Create documents
             documents = self.create_documents(texts, urls)
@@ -321,7 +623,7 @@ class RAGSystem:
             split_docs = self.split_documents(documents)
             
             # Create vector store
-            self.vectorstore = self.create_vectorstore(split_docs)
+            self.vectorstore = self.create_vectorstore(split_docs, persist_directory)
             
             # Set up retrieval QA
             self.setup_retrieval_qa(self.vectorstore)
@@ -333,38 +635,119 @@ class RAGSystem:
             logger.error(f"Error building RAG system: {e}")
             raise
     
-    def query(self, question: str) -> Dict[str, Any]:
+    def query(self, question: str, on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Query the RAG system with a question
         
         Args:
             question: User's question
+            on_token: Optional function called with each answer token as it is generated
             
         Returns:
             Dictionary containing answer and source documents
         """
         try:
-            if not self.qa_chain:
+            if self.retriever is None:
                 raise ValueError("RAG system not initialized. Call build_rag_from_urls() first.")
             
             logger.info(f"Processing query: {question}")
             start_time = time.time()
             
-            # Get response from QA chain
-            response = self.qa_chain({"query": question})
+            # Answer repeated questions from the cache when enabled
+            cached = None
+            if self.query_cache is not None:
+                query_embedding = self.embeddings.embed_query(question)
+                cached = self.query_cache.get(query_embedding)
+            
+            if cached is not None:
+                logger.info("Answered from semantic query cache")
+                answer = cached['answer']
+                source_documents = cached['source_documents']
+                if on_token is not None:
+                    on_token(answer)
+            else:
+                config = None
+                if on_token is not None:
+                    config = {"callbacks": [TokenHandler(on_token)]}
+                
+                # Retrieve context and generate the answer in a single LLM call
+                source_documents = self.retriever.invoke(question)
+                answer = self.llm.invoke(self.build_prompt(question, source_documents), config=config)
+                
+                if self.query_cache is not None:
+                    self.query_cache.put(query_embedding, {
+                        'answer': answer,
+                        'source_documents': source_documents
+                    })
             
             query_time = time.time() - start_time
             logger.info(f"Query processed in {query_time:.2f}s")
             
             return {
-                'answer': response['result'],
-                'source_documents': response['source_documents'],
+                'answer': answer,
+                'source_documents': source_documents,
                 'query_time': query_time
             }
             
         except Exception as e:
             logger.error(f"Error processing query: {e}")
             raise
+    
+    def query_batch(self, questions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Answer several independent questions together
+        
+        All prompts are sent to the LLM concurrently, so an Ollama server
+        started with OLLAMA_NUM_PARALLEL > 1 generates the answers side by
+        side. The semantic query cache is not consulted on this path.
+        
+        Args:
+            questions: Questions to answer
+            
+        Returns:
+            Dictionary containing answer and source documents for each question, in order
+        """
+        try:
+            if self.retriever is None:
+                raise ValueError("RAG system not initialized. Call build_rag_from_urls() first.")
+            
+            logger.info(f"Processing batch of {len(questions)} queries")
+            start_time = time.time()
+            
+            # Embed questions as queries with the wrapped model, bypassing the
+            # document cache (questions would only pollute it)
+            k = self.retriever.search_kwargs.get("k", 4)
+            query_embeddings = [self.embeddings.underlying.embed_query(question) for question in questions]
+            source_documents = [
+                self.vectorstore.similarity_search_by_vector(embedding, k=k)
+                for embedding in query_embeddings
+            ]
+            
+            prompts = [
+                self.build_prompt(question, docs)
+                for question, docs in zip(questions, source_documents)
+            ]
+            
+            async def generate_all():
+                return await asyncio.gather(*(self.llm.ainvoke(prompt) for prompt in prompts))
+            
+            answers = run_async(generate_all())
+            
+            query_time = time.time() - start_time
+            logger.info(f"Batch of {len(questions)} queries processed in {query_time:.2f}s")
+            
+            return [
+                {
+                    'answer': answer,
+                    'source_documents': docs,
+                    'query_time': query_time
+                }
+                for answer, docs in zip(answers, source_documents)
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error processing query batch: {e}")
+            raise
 
 # LangGraph state definition
 from typing import TypedDict, List
@@ -401,19 +784,8 @@ def generate_answer(state: RAGState) -> RAGState:
         question = state['question']
         docs = state.get('source_documents', [])
         
-        # Create context from documents
-        context = "\n\n".join([doc.page_content for doc in docs])
-        
-        # Generate answer
-        prompt = f"""Use the following context to answer the question. If you don't know the answer, say so.
-
-Context: {context}
-
-Question: {question}
-
-Answer:"""
-        
-        answer = rag_system.llm.invoke(prompt)
+        # Generate answer from the same prompt as RAGSystem.query
+        answer = rag_system.llm.invoke(rag_system.build_prompt(question, docs))
         state['answer'] = answer
         
         return state
@@ -0,0 +1,174 @@
+"""
+Re-ranking for Retrieved Documents
+==================================
+
+Maximal Marginal Relevance (MMR) re-ranking of retrieved chunks. The vector
+store returns a larger candidate set together with its stored embeddings, and
+the candidates are re-ranked locally so the final context is both relevant to
+the question and non-redundant.
+
+The numeric kernels are compiled with Numba when it is installed (and cached
+on disk, so compilation is paid only once); otherwise a NumPy implementation
+is used.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _cosine_scores_numpy(query_vec: np.ndarray, doc_vecs: np.ndarray) -> np.ndarray:
+    """Cosine similarity between a query vector and each document vector"""
+    norms = np.linalg.norm(doc_vecs, axis=1) * np.linalg.norm(query_vec)
+    norms[norms == 0.0] = 1.0
+    return doc_vecs @ query_vec / norms
+
+
+def _mmr_select_numpy(query_vec: np.ndarray, doc_vecs: np.ndarray, k: int, lambda_mult: float) -> np.ndarray:
+    """Select k document indices by Maximal Marginal Relevance"""
+    n = doc_vecs.shape[0]
+    k = min(k, n)
+    norms = np.linalg.norm(doc_vecs, axis=1)
+    norms[norms == 0.0] = 1.0
+    unit_vecs = doc_vecs / norms[:, None]
+    relevance = _cosine_scores_numpy(query_vec, doc_vecs)
+
+    selected = np.empty(k, dtype=np.int64)
+    max_redundancy = np.zeros(n)
+    available = np.ones(n, dtype=np.bool_)
+    for i in range(k):
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected[i] = best
+        available[best] = False
+
+        # Track each candidate's similarity to the closest selected document
+        similarity = unit_vecs @ unit_vecs[best]
+        max_redundancy = similarity if i == 0 else np.maximum(max_redundancy, similarity)
+    return selected
+
+
+def _cosine_scores_loops(query_vec, doc_vecs):
+    """Cosine similarity written as explicit loops for Numba compilation"""
+    n, d = doc_vecs.shape
+    query_norm = 0.0
+    for j in range(d):
+        query_norm += query_vec[j] * query_vec[j]
+    query_norm = np.sqrt(query_norm)
+
+    scores = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        dot = 0.0
+        doc_norm = 0.0
+        for j in range(d):
+            dot += doc_vecs[i, j] * query_vec[j]
+            doc_norm += doc_vecs[i, j] * doc_vecs[i, j]
+        denom = np.sqrt(doc_norm) * query_norm
+        scores[i] = dot / denom if denom > 0.0 else 0.0
+    return scores
+
+
+def _mmr_select_loops(query_vec, doc_vecs, k, lambda_mult):
+    """Maximal Marginal Relevance written as explicit loops for Numba compilation"""
+    n, d = doc_vecs.shape
+    k = min(k, n)
+    relevance = _cosine_scores_jit(query_vec, doc_vecs)
+
+    doc_norms = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        total = 0.0
+        for j in range(d):
+            total += doc_vecs[i, j] * doc_vecs[i, j]
+        doc_norms[i] = np.sqrt(total) if total > 0.0 else 1.0
+
+    selected = np.empty(k, dtype=np.int64)
+    max_redundancy = np.zeros(n, dtype=np.float64)
+    available = np.ones(n, dtype=np.bool_)
+    for step in range(k):
+        best = -1
+        best_score = -np.inf
+        for i in range(n):
+            if not available[i]:
+                continue
+            score = lambda_mult * relevance[i] - (1.0 - lambda_mult) * max_redundancy[i]
+            if score > best_score:
+                best_score = score
+                best = i
+        selected[step] = best
+        available[best] = False
+
+        # Update each candidate's similarity to the closest selected document
+        for i in range(n):
+            if not available[i]:
+                continue
+            dot = 0.0
+            for j in range(d):
+                dot += doc_vecs[i, j] * doc_vecs[best, j]
+            similarity = dot / (doc_norms[i] * doc_norms[best])
+            if step == 0 or similarity > max_redundancy[i]:
+                max_redundancy[i] = similarity
+    return selected
+
+
+if njit is not None:
+    _cosine_scores_jit = njit(cache=True, fastmath=True)(_cosine_scores_loops)
+    _mmr_select_jit = njit(cache=True, fastmath=True)(_mmr_select_loops)
+    cosine_scores = _cosine_scores_jit
+    mmr_select = _mmr_select_jit
+else:
+    cosine_scores = _cosine_scores_numpy
+    mmr_select = _mmr_select_numpy
+
+
+def warmup(dim: int = 8):
+    """Trigger JIT compilation (or load the on-disk cache) on a dummy array"""
+    dummy = np.ones((1, dim), dtype=np.float64)
+    mmr_select(dummy[0], dummy, 1, 0.5)
+
+
+class MMRRerankRetriever(BaseRetriever):
+    """
+    Retriever that fetches extra candidates from Chroma and re-ranks them with MMR
+    """
+
+    vectorstore: Any
+    k: int = 4
+    fetch_k: int = 16
+    lambda_mult: float = 0.5
+    filter: Optional[Dict[str, Any]] = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        """Fetch fetch_k candidates with their embeddings and keep the k best by MMR"""
+        query_vec = np.asarray(self.vectorstore.embeddings.embed_query(query), dtype=np.float64)
+
+        results = self.vectorstore._collection.query(
+            query_embeddings=[query_vec.tolist()],
+            n_results=self.fetch_k,
+            where=self.filter,
+            include=["documents", "metadatas", "embeddings"]
+        )
+
+        texts = results["documents"][0]
+        if not texts:
+            return []
+
+        metadatas = results["metadatas"][0]
+        doc_vecs = np.ascontiguousarray(results["embeddings"][0], dtype=np.float64)
+
+        indices = mmr_select(query_vec, doc_vecs, self.k, self.lambda_mult)
+        return [
+            Document(page_content=texts[i], metadata=metadatas[i] or {})
+            for i in indices
+        ]
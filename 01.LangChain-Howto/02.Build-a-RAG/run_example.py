@@ -7,14 +7,18 @@ This script shows how to use the RAG system with the specified URLs.
 
 import os
 import sys
+import json
 import time
+import shutil
+import hashlib
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Add current directory to path
-sys.path.append('.')
+# Vector stores built by earlier runs, one directory per distinct URL set and
+# embedding/chunk settings
+RAG_CACHE_DIR = "./.rag_cache"
 
 def main():
     """Main example function"""
@@ -40,13 +44,27 @@ def main():
         print(f"\n🤖 Initializing RAG system with Ollama...")
         rag = RAGSystem()
         
-        # Build RAG system
-        print(f"\n🔨 Building RAG system from URLs...")
-        start_time = time.time()
-        rag.build_rag_from_urls(urls)
-        build_time = time.time() - start_time
+        # Reuse the vector store of an earlier run over the same URLs with the
+        # same embedding model and chunking (other settings need another store)
+        normalized = sorted({rag.validate_url(url) for url in urls})
+        payload = {"urls": normalized, "settings": rag.index_settings()}
+        cache_key = hashlib.blake2b(json.dumps(payload, sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+        cache_path = os.path.join(RAG_CACHE_DIR, cache_key)
         
-        print(f"✅ RAG system built in {build_time:.2f} seconds")
+        start_time = time.time()
+        if os.path.isdir(cache_path):
+            print(f"\n📂 Loading cached vector store from {cache_path}...")
+            rag.load_vectorstore(cache_path)
+            print(f"✅ RAG system loaded in {time.time() - start_time:.2f} seconds")
+        else:
+            print(f"\n🔨 Building RAG system from URLs...")
+            try:
+                rag.build_rag_from_urls(urls, persist_directory=cache_path)
+            except Exception:
+                # Don't leave a half-built store to be loaded next time
+                shutil.rmtree(cache_path, ignore_errors=True)
+                raise
+            print(f"✅ RAG system built in {time.time() - start_time:.2f} seconds")
         
         # Test questions
         test_questions = [
@@ -63,14 +81,24 @@ def main():
             print(f"\nQuestion {i}: {question}")
             print("-" * 40)
             
-            # Query the system
+            # Stream the answer as it is generated; the first token arrives
+            # long before the full answer is complete
+            print("Answer: ", end="", flush=True)
+            first_token_time = None
+            
+            def on_token(token):
+                nonlocal first_token_time
+                if first_token_time is None:
+                    first_token_time = time.time()
+                print(token, end="", flush=True)
+            
             start_time = time.time()
-            result = rag.query(question)
-            query_time = time.time() - start_time
+            result = rag.query(question, on_token=on_token)
+            total_time = time.time() - start_time
+            print()
             
-            # Display results
-            print(f"Answer: {result['answer']}")
-            print(f"Query time: {query_time:.2f}s")
+            if first_token_time is not None:
+                print(f"First token: {first_token_time - start_time:.2f}s, total: {total_time:.2f}s")
             print(f"Source documents: {len(result['source_documents'])}")
             
             # Show source previews
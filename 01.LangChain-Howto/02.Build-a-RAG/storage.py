@@ -0,0 +1,202 @@
+"""
+SQLite Session Storage
+======================
+
+Stores conversation sessions in a SQLite database so that each new message is
+a single INSERT instead of rewriting the whole sessions JSON file.
+
+Sessions are exchanged with the rest of the system in the same dictionary
+shape used by the JSON sessions file, so either format can be loaded the
+same way.
+"""
+
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    timestamp TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id);
+"""
+
+
+def _dumps(obj: Any) -> str:
+    """Encode a metadata value as JSON text, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
+def _loads(data: str) -> Any:
+    """Decode JSON text, using orjson when it is installed"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class SessionStore:
+    """
+    SQLite-backed store for conversation sessions and messages
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) the session database
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+
+        # Autocommit mode: every write is its own small transaction
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def is_empty(self) -> bool:
+        """Check whether the store has no sessions yet"""
+        return self.conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is None
+
+    def upsert_session(self, session_id: str, created_at: str, updated_at: str,
+                       metadata: Optional[Dict[str, Any]] = None):
+        """
+        Insert a session or update its timestamps and metadata
+
+        Args:
+            session_id: Session ID
+            created_at: ISO creation timestamp
+            updated_at: ISO last-update timestamp
+            metadata: Optional session metadata
+        """
+        self.conn.execute(
+            "INSERT INTO sessions (id, created_at, updated_at, metadata) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET updated_at = excluded.updated_at, metadata = excluded.metadata",
+            (session_id, created_at, updated_at, _dumps(metadata))
+        )
+
+    def append_message(self, session_id: str, role: str, content: str, timestamp: str,
+                       metadata: Optional[Dict[str, Any]] = None):
+        """
+        Append a message to a session and bump the session's update time
+
+        Args:
+            session_id: Session ID
+            role: Message role ('user' or 'assistant')
+            content: Message content
+            timestamp: ISO message timestamp
+            metadata: Optional message metadata
+        """
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute(
+                "INSERT INTO messages (session_id, timestamp, role, content, metadata) VALUES (?, ?, ?, ?, ?)",
+                (session_id, timestamp, role, content, _dumps(metadata))
+            )
+            self.conn.execute("UPDATE sessions SET updated_at = ? WHERE id = ?", (timestamp, session_id))
+
+    def delete_session(self, session_id: str) -> bool:
+        """
+        Delete a session and its messages
+
+        Args:
+            session_id: Session ID to delete
+
+        Returns:
+            True if deleted, False if not found
+        """
+        cursor = self.conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def import_sessions(self, sessions_data: Dict[str, Dict[str, Any]]):
+        """
+        Bulk-import sessions in the JSON sessions-file format
+
+        Args:
+            sessions_data: Mapping of session ID to serialized session
+        """
+        with self.conn:
+            self.conn.execute("BEGIN")
+            for session_id, session in sessions_data.items():
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sessions (id, created_at, updated_at, metadata) VALUES (?, ?, ?, ?)",
+                    (session_id, session["created_at"], session["updated_at"], _dumps(session.get("metadata")))
+                )
+                self.conn.executemany(
+                    "INSERT INTO messages (session_id, timestamp, role, content, metadata) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (session_id, msg["timestamp"], msg["role"], msg["content"], _dumps(msg.get("metadata")))
+                        for msg in session["messages"]
+                    ]
+                )
+
+    def load_sessions(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load all sessions in the JSON sessions-file format
+
+        Returns:
+            Mapping of session ID to serialized session
+        """
+        sessions_data = {}
+        for session_id, created_at, updated_at, metadata in self.conn.execute(
+            "SELECT id, created_at, updated_at, metadata FROM sessions ORDER BY created_at"
+        ):
+            sessions_data[session_id] = {
+                "session_id": session_id,
+                "messages": [],
+                "created_at": created_at,
+                "updated_at": updated_at,
+                "metadata": _loads(metadata) if metadata else None
+            }
+
+        for session_id, timestamp, role, content, metadata in self.conn.execute(
+            "SELECT session_id, timestamp, role, content, metadata FROM messages ORDER BY id"
+        ):
+            sessions_data[session_id]["messages"].append({
+                "role": role,
+                "content": content,
+                "timestamp": timestamp,
+                "metadata": _loads(metadata) if metadata else None
+            })
+
+        return sessions_data
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+
+def open_store(db_path: str, legacy_json: Optional[str] = None) -> SessionStore:
+    """
+    Open a session store, seeding an empty one from a JSON sessions file
+
+    Args:
+        db_path: Path to the SQLite database file
+        legacy_json: Optional JSON sessions file to migrate on first use
+
+    Returns:
+        Opened session store
+    """
+    store = SessionStore(db_path)
+    if store.is_empty() and legacy_json and os.path.exists(legacy_json):
+        with open(legacy_json, 'rb') as f:
+            store.import_sessions(_loads(f.read()))
+    return store
@@ -10,26 +10,44 @@ import os
 import sys
 import time
 import json
+import shutil
 from datetime import datetime
 
 # Import our conversational RAG system
 from conversational_rag import ConversationalRAGSystem, ConversationSession, ConversationMessage
 
+# Throwaway vector store; removed before and after the run so each run
+# indexes only the sample documents instead of appending to earlier runs
+TEST_VECTOR_STORE_PATH = "./test_conversational_chroma_db"
+
+# FAKE_LLM=1 swaps Ollama for canned answers, so the retrieval pipeline can
+# be checked in seconds without a running model
+def make_test_llm():
+    """Return a fake LLM when FAKE_LLM=1, otherwise None (use Ollama)"""
+    if os.getenv('FAKE_LLM') != '1':
+        return None
+    from langchain_community.llms.fake import FakeListLLM
+    return FakeListLLM(responses=["Mock answer about RAG.", "Mock follow-up answer."])
+
 def test_conversational_rag_system():
     """Test the conversational RAG system"""
     print("🚀 Conversational RAG System Test Suite")
     print("=" * 60)
     
+    shutil.rmtree(TEST_VECTOR_STORE_PATH, ignore_errors=True)
+    
     try:
         # Test 1: System initialization
         print("\n1. Testing system initialization...")
         system = ConversationalRAGSystem(
             model_name="llama3.1:8b-instruct-q8_0",
             embedding_model="sentence-transformers/all-MiniLM-L6-v2",
-            vector_store_path="./test_conversational_chroma_db",
+            vector_store_path=TEST_VECTOR_STORE_PATH,
             chunk_size=1000,
             chunk_overlap=200,
-            k_retrieve=4
+            k_retrieve=4,
+            embedding_backend=os.getenv('EMBEDDING_BACKEND', 'auto'),
+            llm=make_test_llm()
         )
         print("✓ Conversational RAG system initialized")
         
@@ -124,6 +142,7 @@ def test_conversational_rag_system():
         system.delete_session(session_id_2)
         if os.path.exists("test_sessions.json"):
             os.remove("test_sessions.json")
+        shutil.rmtree(TEST_VECTOR_STORE_PATH, ignore_errors=True)
         print("✓ Cleanup completed")
         
         print("\n🎉 All conversational RAG system tests passed successfully!")
@@ -135,6 +154,87 @@ def test_conversational_rag_system():
         traceback.print_exc()
         return False
 
+def test_session_store():
+    """Test the SQLite session store: migration, writes, deletes and reload"""
+    print("\n🗄️ Testing SQLite Session Store")
+    print("=" * 40)
+    
+    import tempfile
+    from storage import open_store
+    
+    legacy_sessions = {
+        "legacy_1": {
+            "session_id": "legacy_1",
+            "messages": [
+                {"role": "user", "content": "What is RAG?", "timestamp": "2025-01-01T10:00:00", "metadata": None},
+                {"role": "assistant", "content": "Retrieval-augmented generation.", "timestamp": "2025-01-01T10:00:05",
+                 "metadata": {"source_documents": 2}}
+            ],
+            "created_at": "2025-01-01T10:00:00",
+            "updated_at": "2025-01-01T10:00:05",
+            "metadata": {"model": "llama3.1:8b-instruct-q8_0", "sources": ["sample1"]}
+        },
+        "legacy_2": {
+            "session_id": "legacy_2",
+            "messages": [
+                {"role": "user", "content": "Hello", "timestamp": "2025-01-02T09:00:00", "metadata": None}
+            ],
+            "created_at": "2025-01-02T09:00:00",
+            "updated_at": "2025-01-02T09:00:00",
+            "metadata": None
+        }
+    }
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        legacy_json = os.path.join(temp_dir, "sessions.json")
+        db_path = os.path.join(temp_dir, "sessions.db")
+        with open(legacy_json, "w") as f:
+            json.dump(legacy_sessions, f)
+        
+        # Test 1: Migration from the JSON sessions file
+        store = open_store(db_path, legacy_json)
+        assert store.load_sessions() == legacy_sessions, "migrated sessions differ from the JSON file"
+        print("✓ Migrated legacy JSON sessions")
+        
+        # Test 2: New session and appended messages
+        store.upsert_session("new", "2025-01-03T08:00:00", "2025-01-03T08:00:00", {"model": "test"})
+        store.append_message("new", "user", "Follow-up?", "2025-01-03T08:00:01")
+        store.append_message("new", "assistant", "Answer.", "2025-01-03T08:00:02", {"cached": True})
+        print("✓ Appended messages")
+        
+        # Test 3: Delete a session (and its messages)
+        assert store.delete_session("legacy_2"), "existing session not deleted"
+        assert not store.delete_session("missing"), "missing session reported as deleted"
+        orphans = store.conn.execute("SELECT COUNT(*) FROM messages WHERE session_id = 'legacy_2'").fetchone()[0]
+        assert orphans == 0, "messages of the deleted session were kept"
+        store.close()
+        print("✓ Deleted session and its messages")
+        
+        # Test 4: Reload; the JSON file must not be imported a second time
+        store = open_store(db_path, legacy_json)
+        reloaded = store.load_sessions()
+        store.close()
+        assert list(reloaded) == ["legacy_1", "new"], f"unexpected sessions: {list(reloaded)}"
+        assert reloaded["legacy_1"] == legacy_sessions["legacy_1"], "migrated session changed on reload"
+        new_session = reloaded["new"]
+        assert [m["content"] for m in new_session["messages"]] == ["Follow-up?", "Answer."]
+        assert new_session["messages"][1]["metadata"] == {"cached": True}
+        assert new_session["updated_at"] == "2025-01-03T08:00:02", "update time not bumped by append"
+        assert new_session["metadata"] == {"model": "test"}
+        print("✓ Reloaded store matches")
+        
+        print("\n✓ Session store tests passed")
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ Session store test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
 def test_cli_interface():
     """Test the CLI interface"""
     print("\n🔧 Testing CLI Interface")
@@ -167,6 +267,9 @@ def main():
     # Test core system
     core_success = test_conversational_rag_system()
     
+    # Test session storage
+    store_success = test_session_store()
+    
     # Test CLI interface
     cli_success = test_cli_interface()
     
@@ -180,12 +283,17 @@ def main():
     else:
         print("❌ Core conversational RAG system: FAILED")
     
+    if store_success:
+        print("✅ SQLite session store: PASSED")
+    else:
+        print("❌ SQLite session store: FAILED")
+    
     if cli_success:
         print("✅ CLI interface: PASSED")
     else:
         print("❌ CLI interface: FAILED")
     
-    if core_success and cli_success:
+    if core_success and store_success and cli_success:
         print("\n🎉 All tests passed! The conversational RAG system is ready to use.")
         print("\nNext steps:")
         print("1. Make sure Ollama is running: ollama serve")
@@ -6,20 +6,36 @@ This script helps validate and fix common URL issues for the RAG system.
 """
 
 import re
+from functools import lru_cache
+from typing import Tuple
 from urllib.parse import urlparse
 
-def fix_common_url_issues(url: str) -> str:
+# Common fixes (typo → replacement)
+URL_FIXES = [
+    ('github.ioposts', 'github.io/posts'),
+    ('github.iopost', 'github.io/posts'),
+    ('github.io/posts/posts', 'github.io/posts'),
+    ('www.github.io', 'github.io'),
+    ('docs.python.org/docs', 'docs.python.org'),
+]
+
+# All fixes compiled into one alternation; longer keys first so that
+# 'github.ioposts' wins over its prefix 'github.iopost'
+_FIX_MAP = dict(URL_FIXES)
+_FIX_RE = re.compile('|'.join(re.escape(old) for old in sorted(_FIX_MAP, key=len, reverse=True)))
+
+@lru_cache(maxsize=4096)
+def _fix_url(url: str) -> Tuple[str, bool]:
     """
-    Fix common URL issues and typos
+    Apply the URL fixes without any output; memoized because crawled link
+    lists repeat the same URLs many times
     
     Args:
         url: URL to fix
         
     Returns:
-        Fixed URL
+        Tuple of (fixed URL, whether a domain typo was fixed)
     """
-    original_url = url
-    
     # Add protocol if missing
     if not url.startswith(('http://', 'https://')):
         url = 'https://' + url
@@ -28,23 +44,26 @@ def fix_common_url_issues(url: str) -> str:
     parsed = urlparse(url)
     domain = parsed.netloc.lower()
     
-    # Common fixes
-    fixes = [
-        ('github.ioposts', 'github.io/posts'),
-        ('github.iopost', 'github.io/posts'),
-        ('github.io/posts/posts', 'github.io/posts'),
-        ('www.github.io', 'github.io'),
-        ('docs.python.org/docs', 'docs.python.org'),
-    ]
-    
-    for old, new in fixes:
-        if old in domain:
-            domain = domain.replace(old, new)
-            url = f"{parsed.scheme}://{domain}{parsed.path}"
-            print(f"🔧 Fixed URL: {original_url} → {url}")
-            break
+    # Apply every matching fix in a single regex pass
+    new_domain = _FIX_RE.sub(lambda m: _FIX_MAP[m.group(0)], domain)
+    if new_domain == domain:
+        return url, False
+    return f"{parsed.scheme}://{new_domain}{parsed.path}", True
+
+def fix_common_url_issues(url: str) -> str:
+    """
+    Fix common URL issues and typos
     
-    return url
+    Args:
+        url: URL to fix
+        
+    Returns:
+        Fixed URL
+    """
+    fixed, changed = _fix_url(url)
+    if changed:
+        print(f"🔧 Fixed URL: {url} → {fixed}")
+    return fixed
 
 def validate_url(url: str) -> bool:
     """
@@ -42,8 +42,8 @@ from langchain_core.runnables import RunnableLambda
 def print_stream(iterable: Iterable[Any]):
     """Print streaming chunks as they arrive, on one line."""
     for chunk in iterable:
-        # Chunks from chat models are usually AIMessageChunks or strings
-        print(getattr(chunk, "content", chunk), end="", flush=True)
+        # Chat models and chains ending in one yield AIMessageChunks
+        print(chunk.content, end="", flush=True)
     print()
 
 
@@ -67,7 +67,9 @@ def print_stream(iterable: Iterable[Any]):
 # In[19]:
 
 
-chat = ChatOllama(model=MODEL, temperature=0.3)
+# One instance for the whole notebook: it owns a sync and an async HTTP client
+# whose keep-alive connection pools are reused by every demo below
+chat = ChatOllama(model=MODEL, temperature=0.3, client_kwargs={"timeout": 120})
 
 print("Model:", MODEL)
 print("Streaming response:\n")
@@ -139,7 +141,7 @@ async def input_chunks() -> AsyncIterable[str]:
 
 async def demo_streaming_input():
     async for chunk in stream_chain.astream({"input": input_chunks()}):
-        print(getattr(chunk, "content", chunk), end="", flush=True)
+        print(chunk.content, end="", flush=True)
     print()
 
 # (Run inside a single orchestrated event loop at the end of the file)
@@ -227,6 +229,12 @@ def _safe(obj):
 
 def show_event(e):
     name = e.get("event", e.get("name"))
+    if name.endswith("_stream"):
+        # Per-token events are the bulk of the output: print just the chunk's
+        # text and skip the full payload conversion below
+        chunk = e["data"].get("chunk")
+        print(f"{name}: {getattr(chunk, 'content', chunk)!r}")
+        return
     typ = e.get("type")
     meta = {k: v for k, v in e.items() if k in {"event", "name", "type", "tags", "RunName", "run_id"}}
     data = _safe(e.get("data"))
@@ -341,11 +349,12 @@ async def events_for_chain():
 # #### Filtering Events
 # 
 # Small steps:
-# 1) Filter to only `on_chat_model_stream` to see token payloads
-# 2) Show the token text
+# 1) Ask `astream_events` for chat-model events only (`include_types=["chat_model"]`)
+# 2) Keep the `on_chat_model_stream` events and show the token text
 # 
 # Explanation:
 # - This pattern reduces noise while keeping the live token stream visible.
+# - Filters passed to `astream_events` (`include_names`, `include_types`, `include_tags` and their `exclude_` forms) drop events before they reach your loop; in a chain this skips all the chain and prompt events.
 # 
 
 # In[26]:
@@ -355,12 +364,11 @@ async def only_token_stream():
     async for e in chat.astream_events(
         [HumanMessage(content="Name 3 popular Vietnamese desserts.")],
         version="v1",
+        include_types=["chat_model"],
     ):
-        name = e.get("event", e.get("name"))
-        if name == "on_chat_model_stream":
-            data = e.get("data", {})
-            chunk = data.get("chunk")
-            token_text = getattr(chunk, "content", chunk)
+        if e["event"] == "on_chat_model_stream":
+            # The chunk of a chat model stream event is always an AIMessageChunk
+            token_text = e["data"]["chunk"].content
             if token_text:
                 print(token_text, end="", flush=True)
     print()
@@ -375,12 +383,16 @@ async def only_token_stream():
 # 
 # Explanation:
 # - You’ll see a gap between `on_chain_start` and `on_chat_model_start` proportional to your pre-processing time.
+# - Give blocking steps an async version that runs the work in a thread (`asyncio.to_thread`), so the event loop keeps serving other streams while it waits.
 # 
 
 # In[27]:
 
 
-slow_pre = RunnableLambda(lambda x: {"text": slow_upper(x["text"])})
+async def slow_upper_async(x):
+    return {"text": await asyncio.to_thread(slow_upper, x["text"])}
+
+slow_pre = RunnableLambda(lambda x: {"text": slow_upper(x["text"])}, afunc=slow_upper_async)
 events_chain = slow_pre | prompt | chat
 
 async def events_with_non_streaming():
@@ -419,18 +431,68 @@ async def events_with_forwarder():
         show_event(e)
 # (Run inside a single orchestrated event loop at the end of the file)
 
-# Orchestrate all async demos once to avoid "Event loop is closed" issues
+# Orchestrate all async demos once to avoid "Event loop is closed" issues.
+# The demos are independent network-bound streams, so they run concurrently;
+# each demo's prints go to its own buffer (chosen per task through a context
+# variable) and are shown in order once all have finished.
 import asyncio as _asyncio_for_top_level
+import contextvars
+import io
+import sys
+
+# uvloop's event loop is faster at dispatching the many small socket reads and
+# callbacks a token stream produces; the standard loop is used without it
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+_demo_output = contextvars.ContextVar("demo_output", default=None)
+
+class _PerDemoStdout:
+    """stdout stand-in that writes to the current demo's buffer, if any."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        return (_demo_output.get() or self._stream).write(text)
+
+    def flush(self):
+        if _demo_output.get() is None:
+            self._stream.flush()
+
+async def _buffered(demo):
+    # gather runs each demo in its own task with a copy of the context,
+    # so setting the variable here only affects this demo
+    buffer = io.StringIO()
+    _demo_output.set(buffer)
+    await demo()
+    return buffer.getvalue()
 
 async def _run_all_async_demos():
-    await demo_streaming_input()
-    await events_for_chat()
-    await events_for_chain()
-    await only_token_stream()
-    await events_with_non_streaming()
-    await events_with_forwarder()
-
-_asyncio_for_top_level.run(_run_all_async_demos())
+    demos = [
+        demo_streaming_input,
+        events_for_chat,
+        events_for_chain,
+        only_token_stream,
+        events_with_non_streaming,
+        events_with_forwarder,
+    ]
+    real_stdout = sys.stdout
+    sys.stdout = _PerDemoStdout(real_stdout)
+    try:
+        outputs = await _asyncio_for_top_level.gather(*(_buffered(demo) for demo in demos))
+    finally:
+        sys.stdout = real_stdout
+    for demo, output in zip(demos, outputs):
+        print(f"\n--- {demo.__name__} ---")
+        print(output, end="")
+
+if uvloop is not None:
+    uvloop.run(_run_all_async_demos())
+else:
+    _asyncio_for_top_level.run(_run_all_async_demos())
 
 
 # #### Working with Input Streams
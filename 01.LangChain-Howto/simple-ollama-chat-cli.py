@@ -1,6 +1,8 @@
+from __future__ import annotations
+
 import json
 from pathlib import Path
-from typing import List, Dict
+from typing import TYPE_CHECKING, Dict, Iterator, List
 
 import click
 from rich.console import Console
@@ -8,12 +10,36 @@ from rich.panel import Panel
 from rich.text import Text
 from rich.live import Live
 
-from langchain_ollama import ChatOllama
-from langchain_core.messages import SystemMessage, HumanMessage
+# LangChain (and httpx) are imported where they are first needed, so that
+# `--help` and option errors don't pay for loading them
+if TYPE_CHECKING:
+    from langchain_ollama import ChatOllama
+    from langchain_core.messages import BaseMessage
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 # ---------- Constants ----------
 MODEL_NAME = "llama3.1:8b-instruct-q8_0"
+# Redraws per second of the streaming answer panel (--fancy); tokens are
+# appended to the panel's text in place and picked up by the next redraw
+REFRESH_PER_SECOND = 20
+# Approximate prompt budget for the conversation sent to the model; the full
+# transcript is still kept in the history file
+MAX_HISTORY_TOKENS = 4096
+# Keep the connection to Ollama open between turns: httpx closes idle
+# connections after 5 s by default, shorter than a typical pause to type.
+# (Ollama serves plain HTTP/1.1, so there is no HTTP/2 to negotiate.)
+HTTP_TIMEOUT = 120.0
+HTTP_KEEPALIVE_EXPIRY = 300.0
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 8
+SYSTEM_PROMPT = (
+    "You are a helpful AI assistant. Maintain a friendly tone and answer clearly, "
+    "referring to earlier parts of the conversation when helpful."
+)
 
 
 def find_project_root() -> Path:
@@ -28,99 +54,196 @@ def find_project_root() -> Path:
 
 
 def history_file_path() -> Path:
+    return find_project_root() / "chat_history.jsonl"
+
+
+def legacy_history_file_path() -> Path:
     return find_project_root() / "chat_history.json"
 
 
+def dumps_line(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def valid_message(item) -> bool:
+    return (
+        isinstance(item, dict)
+        and item.get("role") in {"user", "assistant"}
+        and isinstance(item.get("content"), str)
+    )
+
+
+def migrate_legacy_history() -> List[Dict[str, str]]:
+    # One-time conversion of the old whole-file JSON history to JSON Lines
+    legacy_path = legacy_history_file_path()
+    if not legacy_path.exists():
+        return []
+    try:
+        raw = legacy_path.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        if not isinstance(data, list):
+            return []
+        history = [{"role": item["role"], "content": item["content"]} for item in data if valid_message(item)]
+        history_file_path().write_bytes(b"".join(dumps_line(message) for message in history))
+        legacy_path.unlink()
+        return history
+    except Exception:
+        return []
+
+
 def load_chat_history() -> List[Dict[str, str]]:
     file_path = history_file_path()
     if not file_path.exists():
-        return []
+        return migrate_legacy_history()
+    valid_messages = []
     try:
-        data = json.loads(file_path.read_text(encoding="utf-8"))
-        if isinstance(data, list):
-            valid_messages = []
-            for item in data:
-                if isinstance(item, dict) and "role" in item and "content" in item:
-                    if item["role"] in {"user", "assistant"} and isinstance(item["content"], str):
-                        valid_messages.append({"role": item["role"], "content": item["content"]})
-            return valid_messages
-        return []
+        with file_path.open("rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    item = orjson.loads(line) if orjson is not None else json.loads(line)
+                except ValueError:
+                    # Skip a line cut short by an interrupted write
+                    continue
+                if valid_message(item):
+                    valid_messages.append({"role": item["role"], "content": item["content"]})
     except Exception:
         return []
+    return valid_messages
 
 
-def save_chat_history(history: List[Dict[str, str]]) -> None:
-    file_path = history_file_path()
+def append_message(message: Dict[str, str]) -> None:
+    # One line per message, appended: saving a turn costs the same however long the chat is
     try:
-        file_path.write_text(json.dumps(history, ensure_ascii=False, indent=2), encoding="utf-8")
+        with history_file_path().open("ab") as f:
+            f.write(dumps_line(message))
     except Exception:
         # Silently ignore write errors to avoid interrupting chat
         pass
 
 
-def format_history_for_system(history: List[Dict[str, str]]) -> str:
-    if not history:
-        return (
-            "You are a helpful AI assistant. Maintain a friendly tone and answer clearly."
-        )
-    lines = [
-        "You are a helpful AI assistant. Below is the previous conversation history to maintain context. "
-        "Use it to understand ongoing topics, preferences, and references."
-    ]
-    for message in history:
-        role = "User" if message["role"] == "user" else "Assistant"
-        content = message["content"].strip()
-        lines.append(f"{role}: {content}")
-    lines.append("Continue the conversation, referring to the relevant parts of the history when helpful.")
-    return "\n".join(lines)
+def http_client_kwargs() -> Dict[str, object]:
+    import httpx
 
+    return {
+        "timeout": HTTP_TIMEOUT,
+        "limits": httpx.Limits(
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
 
-def stream_response(model: ChatOllama, system_text: str, user_input: str, console: Console) -> str:
-    messages = [
-        SystemMessage(system_text),
-        HumanMessage(user_input),
-    ]
 
-    response_accumulator: str = ""
+def build_messages(history: List[Dict[str, str]]) -> List[BaseMessage]:
+    # Fixed system prompt followed by the turns as native chat messages: each
+    # request starts with the previous request's tokens, so Ollama can reuse
+    # its cached prefix instead of re-reading the whole transcript. Built once
+    # per conversation; each turn then appends its two messages.
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+    messages: List[BaseMessage] = [SystemMessage(SYSTEM_PROMPT)]
+    for message in history:
+        if message["role"] == "user":
+            messages.append(HumanMessage(message["content"]))
+        else:
+            messages.append(AIMessage(message["content"]))
+    return messages
+
+
+def trim_messages(messages: List[BaseMessage], max_tokens: int) -> None:
+    # Keep the prompt under max_tokens (estimated at ~4 characters per token).
+    # Once over, the oldest turns are dropped down to half the budget in one
+    # go, so the kept prefix then stays identical (and cached by Ollama) for
+    # the next several turns instead of shifting on every turn.
+    budget_chars = max_tokens * 4
+    total_chars = sum(len(m.content) for m in messages)
+    if total_chars <= budget_chars:
+        return
+    end = 1  # messages[0] is the system prompt
+    last = len(messages) - 1  # the new question is always kept
+    while end < last and total_chars > budget_chars // 2:
+        total_chars -= len(messages[end].content)
+        end += 1
+    # Start the kept window on a question, not on an orphaned answer
+    while end < last and messages[end].type != "human":
+        end += 1
+    del messages[1:end]
+
+
+def stream_pieces(model: ChatOllama, messages: List[BaseMessage]) -> Iterator[str]:
+    try:
+        for chunk in model.stream(messages):
+            # chunk is an AIMessageChunk with text content
+            yield chunk.content
+    except Exception as e:
+        # Provide user-friendly diagnostics
+        error_message = str(e).lower()
+        if "connection" in error_message and ("refused" in error_message or "failed" in error_message):
+            raise click.ClickException(
+                "Cannot reach Ollama server. Make sure it is running (try: 'ollama serve')."
+            )
+        if "no such model" in error_message or "not found" in error_message:
+            raise click.ClickException(
+                f"Model not found: {MODEL_NAME}. Install it with: 'ollama pull {MODEL_NAME}'."
+            )
+        raise click.ClickException(f"Unexpected error while streaming response: {e}")
+
+
+def stream_response(model: ChatOllama, messages: List[BaseMessage], console: Console, fancy: bool = False) -> str:
+    if fancy:
+        return stream_response_panel(model, messages, console)
+
+    # Write each piece straight to the terminal: the cost per chunk is the
+    # chunk itself, not a redraw of everything received so far
+    pieces: List[str] = []
+    console.print(Text("Assistant:", style="bold green"))
+    for text_piece in stream_pieces(model, messages):
+        pieces.append(text_piece)
+        console.print(text_piece, end="", style="green", soft_wrap=True, highlight=False, markup=False)
+    console.print("\n")
+    return "".join(pieces)
+
+
+def stream_response_panel(model: ChatOllama, messages: List[BaseMessage], console: Console) -> str:
     assistant_title = Text("Assistant", style="bold green")
 
-    # Live rendering area updated as chunks stream in
+    # One panel for the whole answer; its body grows as chunks stream in
+    body = Text("", style="bold green")
+    panel = Panel(body, title=assistant_title, border_style="green")
+
     with Live(
-        Panel(Text("", style="bold green"), title=assistant_title, border_style="green"),
-        refresh_per_second=24,
+        panel,
+        refresh_per_second=REFRESH_PER_SECOND,
         console=console,
     ) as live:
-        try:
-            for chunk in model.stream(messages):
-                # chunk is an AIMessageChunk; accumulate text
-                text_piece = getattr(chunk, "content", "")
-                if not isinstance(text_piece, str):
-                    continue
-                response_accumulator += text_piece
-                live.update(Panel(Text(response_accumulator, style="bold green"), title=assistant_title, border_style="green"))
-        except Exception as e:
-            # Provide user-friendly diagnostics
-            error_message = str(e).lower()
-            if "connection" in error_message and ("refused" in error_message or "failed" in error_message):
-                raise click.ClickException(
-                    "Cannot reach Ollama server. Make sure it is running (try: 'ollama serve')."
-                )
-            if "no such model" in error_message or "not found" in error_message:
-                raise click.ClickException(
-                    f"Model not found: {MODEL_NAME}. Install it with: 'ollama pull {MODEL_NAME}'."
-                )
-            raise click.ClickException(f"Unexpected error while streaming response: {e}")
+        for text_piece in stream_pieces(model, messages):
+            body.append(text_piece)
+        # Draw whatever arrived after the last refresh
+        live.refresh()
 
     console.print()  # newline after live panel
-    return response_accumulator
+    return body.plain
 
 
 @click.command()
 @click.option("--temperature", default=0.2, show_default=True, help="Sampling temperature for the model.")
-def chat(temperature: float) -> None:
+@click.option("--fancy", is_flag=True, help="Stream answers inside a live-updating panel.")
+@click.option(
+    "--max-history-tokens",
+    default=MAX_HISTORY_TOKENS,
+    show_default=True,
+    help="Approximate token budget for the conversation sent to the model.",
+)
+def chat(temperature: float, fancy: bool, max_history_tokens: int) -> None:
     """
     Real-time streaming chat CLI with a local Ollama model using LangChain.
     """
+    from langchain_ollama import ChatOllama
+    from langchain_core.messages import AIMessage, HumanMessage
+
     console = Console()
 
     # Header
@@ -141,10 +264,11 @@ def chat(temperature: float) -> None:
         console.print(Panel(Text("Loaded previous chat history. Context will be applied.", style="yellow"), border_style="yellow"))
     else:
         console.print(Panel(Text("Starting a new conversation.", style="cyan"), border_style="cyan"))
+    messages = build_messages(history)
 
     # Initialize model
     try:
-        model = ChatOllama(model=MODEL_NAME, temperature=temperature)
+        model = ChatOllama(model=MODEL_NAME, temperature=temperature, client_kwargs=http_client_kwargs())
     except Exception as e:
         raise click.ClickException(f"Failed to initialize Ollama model: {e}")
 
@@ -167,16 +291,19 @@ def chat(temperature: float) -> None:
         # Show user message
         console.print(Panel(Text(normalized, style="bold cyan"), title=Text("You", style="bold cyan"), border_style="cyan"))
 
-        # Compose system prompt with prior context
-        system_text = format_history_for_system(history)
-
-        # Stream assistant response
-        assistant_response = stream_response(model, system_text, normalized, console)
+        # Stream assistant response to the prior turns plus the new question
+        messages.append(HumanMessage(normalized))
+        trim_messages(messages, max_history_tokens)
+        assistant_response = stream_response(model, messages, console, fancy)
+        messages.append(AIMessage(assistant_response))
 
         # Persist to history
-        history.append({"role": "user", "content": normalized})
-        history.append({"role": "assistant", "content": assistant_response})
-        save_chat_history(history)
+        for message in (
+            {"role": "user", "content": normalized},
+            {"role": "assistant", "content": assistant_response},
+        ):
+            history.append(message)
+            append_message(message)
 
     console.print(Panel(Text("Goodbye!", style="bold magenta"), border_style="magenta"))
 
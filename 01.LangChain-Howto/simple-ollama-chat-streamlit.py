@@ -1,13 +1,44 @@
+from __future__ import annotations
+
 import json
+import time
 from pathlib import Path
-from typing import List, Dict, Iterable
+from typing import TYPE_CHECKING, List, Dict, Iterable
 
 import streamlit as st
-from langchain_ollama import ChatOllama
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+# langchain_ollama (and httpx) load on the first question, not on first render
+if TYPE_CHECKING:
+    from langchain_ollama import ChatOllama
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 MODEL_NAME = "llama3.1:8b-instruct-q8_0"
+# Streamed tokens are rendered at most every FLUSH_INTERVAL seconds (or once
+# FLUSH_MAX_CHARS characters are pending) instead of once per token
+FLUSH_INTERVAL = 0.025
+FLUSH_MAX_CHARS = 8192
+# Messages shown as individual chat bubbles; older ones are rendered together
+# as one markdown block, so reruns don't rebuild a widget per past message
+RECENT_MESSAGES = 20
+# Approximate prompt budget for the conversation sent to the model; the full
+# transcript is still kept in the history file
+MAX_HISTORY_TOKENS = 4096
+# Keep the connection to Ollama open between turns: httpx closes idle
+# connections after 5 s by default, shorter than a typical pause to type.
+# (Ollama serves plain HTTP/1.1, so there is no HTTP/2 to negotiate.)
+HTTP_TIMEOUT = 120.0
+HTTP_KEEPALIVE_EXPIRY = 300.0
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 8
+SYSTEM_PROMPT = (
+    "You are a helpful AI assistant. Maintain a friendly tone and answer clearly, "
+    "referring to earlier parts of the conversation when helpful."
+)
 
 
 def find_project_root() -> Path:
@@ -16,68 +47,164 @@ def find_project_root() -> Path:
 
 
 def history_file_path() -> Path:
+    return find_project_root() / "chat_history.jsonl"
+
+
+def legacy_history_file_path() -> Path:
     return find_project_root() / "chat_history.json"
 
 
+def dumps_line(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def valid_message(item) -> bool:
+    return (
+        isinstance(item, dict)
+        and item.get("role") in {"user", "assistant"}
+        and isinstance(item.get("content"), str)
+    )
+
+
+def migrate_legacy_history() -> List[Dict[str, str]]:
+    # One-time conversion of the old whole-file JSON history to JSON Lines
+    legacy_path = legacy_history_file_path()
+    if not legacy_path.exists():
+        return []
+    try:
+        raw = legacy_path.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        if not isinstance(data, list):
+            return []
+        history = [{"role": item["role"], "content": item["content"]} for item in data if valid_message(item)]
+        history_file_path().write_bytes(b"".join(dumps_line(message) for message in history))
+        legacy_path.unlink()
+        return history
+    except Exception:
+        return []
+
+
 def load_chat_history() -> List[Dict[str, str]]:
     file_path = history_file_path()
     if not file_path.exists():
-        return []
+        return migrate_legacy_history()
+    valid_messages = []
     try:
-        data = json.loads(file_path.read_text(encoding="utf-8"))
-        if isinstance(data, list):
-            valid_messages = []
-            for item in data:
-                if isinstance(item, dict) and "role" in item and "content" in item:
-                    if item["role"] in {"user", "assistant"} and isinstance(item["content"], str):
-                        valid_messages.append({"role": item["role"], "content": item["content"]})
-            return valid_messages
-        return []
+        with file_path.open("rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    item = orjson.loads(line) if orjson is not None else json.loads(line)
+                except ValueError:
+                    # Skip a line cut short by an interrupted write
+                    continue
+                if valid_message(item):
+                    valid_messages.append({"role": item["role"], "content": item["content"]})
     except Exception:
         return []
+    return valid_messages
 
 
-def save_chat_history(history: List[Dict[str, str]]) -> None:
-    file_path = history_file_path()
+@st.cache_data(show_spinner=False)
+def load_chat_history_cached(mtime_ns: int) -> List[Dict[str, str]]:
+    # Keyed on the file's modification time: new sessions (page reloads, extra
+    # tabs) reuse the parsed history until another turn is appended
+    return load_chat_history()
+
+
+def history_mtime_ns() -> int:
+    try:
+        return history_file_path().stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def append_message(message: Dict[str, str]) -> None:
+    # One line per message, appended: saving a turn costs the same however long the chat is
     try:
-        file_path.write_text(json.dumps(history, ensure_ascii=False, indent=2), encoding="utf-8")
+        with history_file_path().open("ab") as f:
+            f.write(dumps_line(message))
     except Exception:
         pass
 
 
-def format_history_for_system(history: List[Dict[str, str]]) -> str:
-    if not history:
-        return (
-            "You are a helpful AI assistant. Maintain a friendly tone and answer clearly."
-        )
-    lines = [
-        "You are a helpful AI assistant. Below is the previous conversation history to maintain context. "
-        "Use it to understand ongoing topics, preferences, and references."
-    ]
+def build_messages(history: List[Dict[str, str]]) -> List[BaseMessage]:
+    # Fixed system prompt followed by the turns as native chat messages: each
+    # request starts with the previous request's tokens, so Ollama can reuse
+    # its cached prefix instead of re-reading the whole transcript. Built once
+    # per conversation; each turn then appends its two messages.
+    messages: List[BaseMessage] = [SystemMessage(SYSTEM_PROMPT)]
     for message in history:
-        role = "User" if message["role"] == "user" else "Assistant"
-        content = message["content"].strip()
-        lines.append(f"{role}: {content}")
-    lines.append("Continue the conversation, referring to the relevant parts of the history when helpful.")
-    return "\n".join(lines)
+        if message["role"] == "user":
+            messages.append(HumanMessage(message["content"]))
+        else:
+            messages.append(AIMessage(message["content"]))
+    return messages
+
+
+def trim_messages(messages: List[BaseMessage], max_tokens: int) -> None:
+    # Keep the prompt under max_tokens (estimated at ~4 characters per token).
+    # Once over, the oldest turns are dropped down to half the budget in one
+    # go, so the kept prefix then stays identical (and cached by Ollama) for
+    # the next several turns instead of shifting on every turn.
+    budget_chars = max_tokens * 4
+    total_chars = sum(len(m.content) for m in messages)
+    if total_chars <= budget_chars:
+        return
+    end = 1  # messages[0] is the system prompt
+    last = len(messages) - 1  # the new question is always kept
+    while end < last and total_chars > budget_chars // 2:
+        total_chars -= len(messages[end].content)
+        end += 1
+    # Start the kept window on a question, not on an orphaned answer
+    while end < last and messages[end].type != "human":
+        end += 1
+    del messages[1:end]
 
 
 @st.cache_resource(show_spinner=False)
 def get_model(temperature: float) -> ChatOllama:
-    return ChatOllama(model=MODEL_NAME, temperature=temperature)
+    import httpx
+    from langchain_ollama import ChatOllama
+
+    limits = httpx.Limits(
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    return ChatOllama(
+        model=MODEL_NAME,
+        temperature=temperature,
+        client_kwargs={"timeout": HTTP_TIMEOUT, "limits": limits},
+    )
 
 
-def stream_generator(model: ChatOllama, system_text: str, user_input: str) -> Iterable[str]:
-    messages = [
-        SystemMessage(system_text),
-        HumanMessage(user_input),
-    ]
+def stream_generator(model: ChatOllama, messages: List[BaseMessage]) -> Iterable[str]:
     for chunk in model.stream(messages):
-        text = getattr(chunk, "content", "")
+        text = chunk.content
         if text:
             yield text
 
 
+def coalesce(pieces: Iterable[str]) -> Iterable[str]:
+    pending: List[str] = []
+    pending_chars = 0
+    last_flush = time.monotonic()
+    for piece in pieces:
+        pending.append(piece)
+        pending_chars += len(piece)
+        now = time.monotonic()
+        if now - last_flush >= FLUSH_INTERVAL or pending_chars >= FLUSH_MAX_CHARS:
+            yield "".join(pending)
+            pending = []
+            pending_chars = 0
+            last_flush = now
+    if pending:
+        yield "".join(pending)
+
+
 st.set_page_config(page_title="LangChain × Ollama (Streaming Chat)", page_icon="💬", layout="centered")
 st.title("LangChain × Ollama (Streaming Chat)")
 st.caption(f"Model: {MODEL_NAME}")
@@ -88,16 +215,26 @@ with st.sidebar:
     clear = st.button("Clear chat history", use_container_width=True)
     if clear:
         st.session_state.pop("history", None)
+        st.session_state.pop("messages", None)
+        load_chat_history_cached.clear()
         try:
             history_file_path().unlink(missing_ok=True)
+            legacy_history_file_path().unlink(missing_ok=True)
         except Exception:
             pass
         st.rerun()
 
 if "history" not in st.session_state:
-    st.session_state.history = load_chat_history()
+    st.session_state.history = load_chat_history_cached(history_mtime_ns())
+if "messages" not in st.session_state:
+    st.session_state.messages = build_messages(st.session_state.history)
+
+older = st.session_state.history[:-RECENT_MESSAGES]
+if older:
+    with st.expander(f"Earlier conversation ({len(older)} messages)"):
+        st.markdown("\n\n".join(f"**{m['role'].title()}:** {m['content']}" for m in older))
 
-for m in st.session_state.history:
+for m in st.session_state.history[-RECENT_MESSAGES:]:
     with st.chat_message("user" if m["role"] == "user" else "assistant"):
         st.markdown(m["content"])
 
@@ -112,16 +249,18 @@ if user_input:
         st.error(f"Failed to initialize Ollama model: {e}")
         st.stop()
 
-    system_text = format_history_for_system(st.session_state.history)
+    messages = st.session_state.messages
+    messages.append(HumanMessage(user_input))
+    trim_messages(messages, MAX_HISTORY_TOKENS)
 
     with st.chat_message("assistant"):
-        placeholder = st.empty()
-        collected = ""
         try:
-            for piece in stream_generator(model, system_text, user_input):
-                collected += piece
-                placeholder.markdown(collected)
+            # write_stream renders the (coalesced) pieces as they arrive and
+            # returns the full text once the stream ends
+            collected = st.write_stream(coalesce(stream_generator(model, messages)))
         except Exception as e:
+            # The question was not answered; keep messages in step with history
+            messages.pop()
             msg = str(e).lower()
             if "connection" in msg and ("refused" in msg or "failed" in msg):
                 st.error("Cannot reach Ollama server. Make sure it is running (try: `ollama serve`).")
@@ -131,8 +270,12 @@ if user_input:
                 st.error(f"Unexpected error while streaming response: {e}")
             st.stop()
 
-    st.session_state.history.append({"role": "user", "content": user_input})
-    st.session_state.history.append({"role": "assistant", "content": collected})
-    save_chat_history(st.session_state.history)
+    messages.append(AIMessage(collected))
+    for message in (
+        {"role": "user", "content": user_input},
+        {"role": "assistant", "content": collected},
+    ):
+        st.session_state.history.append(message)
+        append_message(message)
 
 
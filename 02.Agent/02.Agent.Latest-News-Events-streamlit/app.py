@@ -3,6 +3,13 @@ import sys
 import platform
 from pathlib import Path
 import os
+import json
+import queue
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
 
 # Add parent directory to path to import from the notebook environment
 sys.path.append(str(Path(__file__).parent.parent))
@@ -13,14 +20,34 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent.parent / ".env.local"
 load_dotenv(env_path)
 
-# Import the agent components
-from langchain.tools import tool
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langgraph.prebuilt import create_react_agent
+# API keys the agent needs, checked once at startup so a misconfigured
+# environment is reported before any agent is built
+REQUIRED_KEYS = ("GOOGLE_API_KEY", "TAVILY_API_KEY")
+MISSING_KEYS = [key for key in REQUIRED_KEYS if not os.environ.get(key)]
+
+# The agent components (LangChain, Gemini, Tavily, LangGraph) are imported in
+# initialize_agent, so the page shell renders before they load
+from pydantic import BaseModel, Field
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
 
 # Import configuration
-from config import NEWS_CATEGORIES, APP_CONFIG, AGENT_CONFIG, STYLE_CONFIG
+from config import NEWS_CATEGORIES, CATEGORY_NAMES, CATEGORY_PROMPTS, APP_CONFIG, AGENT_CONFIG, STYLE_CONFIG
+
+# URL inside a source line
+_URL_RE = re.compile(r'https?://\S+')
+
+# Longer summaries show this many characters, with the rest behind "Show full article"
+SUMMARY_PREVIEW_CHARS = 2048
+
+# Seconds between redraws of an answer while it streams in
+STREAM_RENDER_INTERVAL = 0.1
+
+# Callback receiving (message id, text) for answer tokens as the agent streams
+_token_sink = ContextVar("token_sink", default=None)
 
 # Page configuration
 st.set_page_config(
@@ -31,8 +58,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling (dark theme)
-st.markdown("""
-<style>
+CUSTOM_CSS = """
     /* Dark theme base */
     .stApp, [data-testid="stAppViewContainer"] {
         background-color: #0e1117 !important;
@@ -151,13 +177,37 @@ st.markdown("""
         padding: 1rem;
         margin: 1rem 0;
     }
-</style>
-""", unsafe_allow_html=True)
+"""
+
+def minify_css(css):
+    """Drop comments and redundant whitespace from a stylesheet"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};])\s*', r'\1', css).strip()
+
+# The style block is re-sent to the browser on every rerun, so it is
+# minified once here instead of shipping the commented source each time
+_STYLE_HTML = f"<style>{minify_css(CUSTOM_CSS)}</style>"
+st.markdown(_STYLE_HTML, unsafe_allow_html=True)
+
+class NewsSource(BaseModel):
+    """A source cited in a news answer"""
+    title: str = Field(description="Title of the article or page")
+    url: str = Field(description="Link to the article or page")
+
+class NewsResponse(BaseModel):
+    """Structured news answer returned by the agent"""
+    summary: str = Field(description="Summary of the news, in markdown")
+    sources: list[NewsSource] = Field(default_factory=list, description="Sources cited in the summary")
 
 @st.cache_resource
 def initialize_agent():
     """Initialize the news agent with caching"""
     try:
+        from langchain_community.tools.tavily_search import TavilySearchResults
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        from langgraph.prebuilt import create_react_agent
+        
         # LLM
         llm = ChatGoogleGenerativeAI(
             model=AGENT_CONFIG["model"], 
@@ -165,29 +215,179 @@ def initialize_agent():
         )
         
         # Tools
-        search = TavilySearchResults(max_results=AGENT_CONFIG["max_results"])
+        # Snippets only: no raw page bodies or Tavily-written answer, so the
+        # tool output fed back to the LLM stays small
+        search = TavilySearchResults(
+            max_results=AGENT_CONFIG["max_results"],
+            search_depth=AGENT_CONFIG.get("search_depth", "basic"),
+            include_raw_content=False,
+            include_answer=False
+        )
         
         # Agent
-        agent = create_react_agent(llm, tools=[search])
+        # Structured answers don't apply to batch mode, whose answer is one JSON
+        # object covering every category
+        structured = AGENT_CONFIG.get("structured_output", False) and not AGENT_CONFIG.get("batch_mode", False)
+        agent = create_react_agent(llm, tools=[search], response_format=NewsResponse if structured else None)
         
         return agent
     except Exception as e:
         st.error(f"Error initializing agent: {e}")
         return None
 
-def get_news_content(agent, prompt):
-    """Get news content from the agent"""
+@st.cache_resource
+def _disk_cache():
+    """Answer cache on disk, kept across server restarts (None without diskcache)"""
+    if diskcache is None:
+        return None
+    return diskcache.Cache(str(Path(__file__).parent / ".news_cache"))
+
+@st.cache_data(ttl=AGENT_CONFIG.get("cache_ttl", 300), show_spinner=False)
+def _invoke_agent(prompt):
+    """Run the agent on a prompt; answers are cached per prompt in memory for cache_ttl seconds and on disk for disk_cache_ttl"""
+    # Second tier: answers saved on disk by this or an earlier server process
+    disk = _disk_cache()
+    if disk is not None:
+        cached = disk.get(prompt)
+        if cached is not None:
+            return cached
+    
+    agent = initialize_agent()
+    if agent is None:
+        raise RuntimeError("News agent is not initialized")
+    sink = _token_sink.get()
+    state = None
+    for mode, payload in agent.stream(
+        {"messages": [("user", prompt)]},
+        stream_mode=["messages", "values"]
+    ):
+        if mode == "values":
+            state = payload
+        elif sink is not None:
+            chunk, metadata = payload
+            if metadata.get("langgraph_node") == "agent" and isinstance(chunk.content, str) and chunk.content:
+                sink(chunk.id, chunk.content)
+    if state.get("structured_response") is not None:
+        return state["structured_response"], datetime.now()
+    last = state["messages"][-1]
+    content = getattr(last, "content", last)
+    result = (content, datetime.now())
+    if disk is not None and isinstance(content, str):
+        disk.set(prompt, result, expire=AGENT_CONFIG.get("disk_cache_ttl", 1800))
+    return result
+
+def fetch_agent_answer(prompt, placeholder=None):
+    """Get the agent's answer within timeout_s seconds, showing its text in placeholder (if given) while it streams in"""
+    # The cached _invoke_agent runs on a worker thread and hands tokens over a
+    # queue: a cache hit returns at once, a miss is drawn as it arrives
+    tokens = queue.Queue()
+    timeout = AGENT_CONFIG.get("timeout_s", 120)
+
+    def fetch():
+        if placeholder is not None:
+            _token_sink.set(lambda message_id, text: tokens.put((message_id, text)))
+        return _invoke_agent(prompt)
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="news-fetch")
+    try:
+        future = executor.submit(fetch)
+        message_id, parts, tail = None, [], ""
+        area = slot = None
+        last_render = time.monotonic()
+        deadline = last_render + timeout
+        while not (future.done() and tokens.empty()):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"The news agent did not answer within {timeout} seconds")
+            try:
+                chunk_id, text = tokens.get(timeout=STREAM_RENDER_INTERVAL)
+            except queue.Empty:
+                continue
+            # A new message (e.g. after a search) replaces the text shown so far
+            if chunk_id != message_id:
+                message_id, parts, tail = chunk_id, [], ""
+                area = placeholder.container()
+                slot = area.empty()
+            parts.append(text)
+            now = time.monotonic()
+            if now - last_render >= STREAM_RENDER_INTERVAL:
+                # Paragraphs that are complete are drawn once in their own
+                # element; only the unfinished last one is redrawn each time
+                blocks = (tail + "".join(parts)).split("\n\n")
+                parts = []
+                for block in blocks[:-1]:
+                    slot.markdown(block)
+                    slot = area.empty()
+                tail = blocks[-1]
+                slot.markdown(tail)
+                last_render = now
+        return future.result()
+    finally:
+        # Don't wait for a timed-out call; if it finishes later, its answer
+        # still lands in the cache
+        executor.shutdown(wait=False)
+
+@st.cache_resource
+def _prefetch_pool():
+    """Shared worker pool for fetching categories in the background"""
+    return ThreadPoolExecutor(
+        max_workers=AGENT_CONFIG.get("prefetch_workers", 3),
+        thread_name_prefix="news-prefetch"
+    )
+
+def prefetch_categories(prompts):
+    """Warm the answer cache for the given prompts without blocking the page"""
+    pool = _prefetch_pool()
+    for prompt in prompts:
+        # Failures are left for the foreground call to report
+        pool.submit(_invoke_agent, prompt)
+
+def build_batched_prompt(categories):
+    """Combine all category prompts into one request for a JSON object"""
+    return (
+        "Answer each of the following requests. Return only a JSON object whose keys are "
+        "exactly the request names below and whose values are the answers as plain text, "
+        "each ending with its sources (with links).\n"
+        + "\n".join(f"- {name}: {category['prompt']}" for name, category in categories.items())
+    )
+
+def parse_batched_answer(content):
+    """Parse the JSON object returned for a batched prompt (code fences are ignored)"""
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end < start:
+        return {}
     try:
-        response = agent.invoke({
-            "messages": [
-                ("user", prompt)
-            ]
-        })
-        last = response["messages"][-1]
-        content = getattr(last, "content", last)
-        return format_news_content(content)
+        sections = json.loads(content[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(sections, dict):
+        return {}
+    return {name: answer for name, answer in sections.items() if isinstance(answer, str)}
+
+def get_news_content(prompt, placeholder=None):
+    """Get news content from the agent, streaming it into placeholder if given"""
+    try:
+        content, fetched_at = fetch_agent_answer(prompt, placeholder)
+        if isinstance(content, NewsResponse):
+            return format_structured_news(content) + format_timestamp(fetched_at)
+        return format_news_content(content) + format_timestamp(fetched_at)
+    except Exception as e:
+        return format_error(e)
+
+def get_batched_news_content(category_name):
+    """Get one category's news from a single agent run covering all categories"""
+    try:
+        content, fetched_at = fetch_agent_answer(build_batched_prompt(NEWS_CATEGORIES))
+        section = parse_batched_answer(content).get(category_name)
+        if section is None:
+            # The batched answer is missing this category; ask for it on its own
+            return get_news_content(CATEGORY_PROMPTS[category_name])
+        return format_news_content(section) + format_timestamp(fetched_at)
     except Exception as e:
-        return f"""
+        return format_error(e)
+
+def format_error(e):
+    """Format an agent error as markdown"""
+    return f"""
 ## ❌ Error Loading News
 
 <div class="highlight-box">
@@ -201,84 +401,141 @@ def get_news_content(agent, prompt):
 </div>
 """
 
+def split_preview(text, limit):
+    """Split text into a preview of at most limit characters (ending at a sentence if possible) and the rest"""
+    if len(text) <= limit:
+        return text, ""
+    cut = text.rfind(". ", 0, limit)
+    if cut < limit // 2:
+        cut = text.rfind(" ", 0, limit)
+    if cut <= 0:
+        cut = limit - 1
+    return text[:cut + 1], text[cut + 1:].lstrip()
+
+@st.cache_data(max_entries=64, show_spinner=False)
 def format_news_content(content):
-    """Format news content into structured markdown"""
-    import re
-    from datetime import datetime
-    
-    # Split content into sections
-    lines = content.split('\n')
-    formatted_sections = []
-    
-    # Extract summary and sources
-    summary = ""
+    """Format news content into structured markdown (cached per answer, so reruns skip re-parsing)"""
+    # Extract summary and sources in one pass over the lines; sources are
+    # kept together with the URL found in them
+    summary_parts = []
     sources = []
     current_section = ""
     
-    for line in lines:
+    for line in content.split('\n'):
         line = line.strip()
         if not line:
             continue
-            
-        # Check if this is a source line (contains URL)
-        if 'http' in line and ('[' in line or 'https://' in line):
-            sources.append(line)
-        elif 'Summary:' in line or 'summary:' in line:
+        
+        url = _URL_RE.search(line)
+        lowered = line.lower()
+        # Check if this is a source line (markdown link or https URL)
+        if url and ('[' in line or 'https://' in line):
+            sources.append((line, url.group(0)))
+        elif 'summary:' in lowered:
             current_section = "summary"
-        elif 'Sources:' in line or 'sources:' in line:
+        elif 'sources:' in lowered:
             current_section = "sources"
         elif current_section == "summary":
-            summary += line + " "
-        elif current_section == "sources":
-            if 'http' in line:
-                sources.append(line)
+            summary_parts.append(line)
+        elif current_section == "sources" and url:
+            sources.append((line, url.group(0)))
     
     # If no structured format found, treat the whole content as summary
-    if not summary:
-        summary = content
+    summary = " ".join(summary_parts) if summary_parts else content
+    
+    links = []
+    for source, url in sources:
+        if '](' in source:
+            # Already in markdown format
+            links.append(source)
+        else:
+            # Convert to markdown link
+            title = source.replace(url, '').strip() or url
+            links.append(f"[{title}]({url})")
+    
+    return render_news_markdown(summary, links)
+
+def format_structured_news(response):
+    """Format a structured agent answer as markdown"""
+    links = [f"[{source.title}]({source.url})" for source in response.sources]
+    return render_news_markdown(response.summary, links)
+
+def render_news_markdown(summary, links):
+    """Render a news summary and its source links into the news card markdown"""
+    summary, rest = split_preview(summary.strip(), SUMMARY_PREVIEW_CHARS)
+    if rest:
+        summary += f"\n<details><summary>Show full article</summary>\n{rest}\n</details>"
     
-    # Format as markdown
-    markdown_content = f"""
+    # Format as markdown; pieces are collected and joined once at the end
+    parts = [f"""
 ## 📰 Latest News Summary
 
 <div class="news-summary">
-{summary.strip()}
+{summary}
 </div>
 
 ## 🔗 Sources
 
 <div class="sources-section">
-"""
+"""]
     
     # Format sources
-    for i, source in enumerate(sources, 1):
-        # Extract URL and title if available
-        if '[' in source and '](' in source:
-            # Already in markdown format
-            markdown_content += f"\n{i}. {source}\n"
-        elif 'http' in source:
-            # Convert to markdown link
-            url = re.search(r'https?://[^\s]+', source)
-            if url:
-                url = url.group(0)
-                title = source.replace(url, '').strip()
-                if not title:
-                    title = url
-                markdown_content += f"\n{i}. [{title}]({url})\n"
-            else:
-                markdown_content += f"\n{i}. {source}\n"
-        else:
-            markdown_content += f"\n{i}. {source}\n"
+    for i, link in enumerate(links, 1):
+        parts.append(f"\n{i}. {link}\n")
     
-    markdown_content += f"""
+    parts.append("""
 </div>
+""")
+    
+    return "".join(parts)
 
+def format_timestamp(fetched_at):
+    """Format the time an answer was fetched and its age; kept out of the cached body markdown"""
+    minutes = int((datetime.now() - fetched_at).total_seconds() // 60)
+    age = "just now" if minutes < 1 else f"{minutes} min ago"
+    return f"""
 <div class="timestamp">
-📅 Last updated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
+📅 Last updated: {fetched_at.strftime('%B %d, %Y at %I:%M %p')} ({age})
 </div>
 """
+
+@st.fragment
+def render_news(selected_category):
+    """Render the selected category's news; Refresh reruns only this part of the page"""
+    # Main content area with enhanced styling
+    st.markdown(f'<div class="category-header">🌍 {selected_category}</div>', unsafe_allow_html=True)
+    
+    # Add a refresh button
+    col1, col2 = st.columns([1, 4])
+    with col1:
+        if st.button("🔄 Refresh News", type="primary"):
+            # The click already reruns this fragment, and the fetch below comes
+            # after this point: dropping the cached answers is enough for it
+            # to ask the agent again, without a further rerun
+            _invoke_agent.clear()
+            if _disk_cache() is not None:
+                _disk_cache().clear()
+            st.toast("Refreshing…")
+    
+    with col2:
+        st.markdown("*Click refresh to get the latest news*")
+    
+    # Get and display news with enhanced loading state; a fresh answer is
+    # shown as plain text while it streams, then replaced by the news card
+    news_placeholder = st.empty()
+    with st.spinner(f"🔍 Fetching latest {selected_category.lower()} news..."):
+        if AGENT_CONFIG.get("batch_mode", False):
+            news_content = get_batched_news_content(selected_category)
+        else:
+            news_content = get_news_content(CATEGORY_PROMPTS[selected_category], news_placeholder)
+    
+    # Display news content using streamlit.markdown() with custom styling
+    news_placeholder.markdown(f"""<div class="news-card">
+{news_content}
+</div>""", unsafe_allow_html=True)
     
-    return markdown_content
+    # Success message
+    st.success("✅ News content loaded successfully!")
 
 def main():
     # Header
@@ -288,20 +545,21 @@ def main():
     st.sidebar.markdown('<div class="sidebar-section">', unsafe_allow_html=True)
     st.sidebar.markdown("## 🎯 News Categories")
     
-    # Use news categories from configuration
-    news_categories = NEWS_CATEGORIES
-    
     # Sidebar selection
     selected_category = st.sidebar.selectbox(
         "Choose a news category:",
-        list(news_categories.keys()),
+        CATEGORY_NAMES,
         index=0
     )
     
     # Display category description
-    st.sidebar.markdown(f"**{news_categories[selected_category]['description']}**")
+    st.sidebar.markdown(f"**{NEWS_CATEGORIES[selected_category]['description']}**")
     st.sidebar.markdown('</div>', unsafe_allow_html=True)
     
+    if MISSING_KEYS:
+        st.error(f"Missing API keys: {', '.join(MISSING_KEYS)}. Please add them to {env_path}.")
+        return
+    
     # Initialize agent
     with st.spinner("Initializing news agent..."):
         agent = initialize_agent()
@@ -310,29 +568,18 @@ def main():
         st.error("Failed to initialize the news agent. Please check your environment setup.")
         return
     
-    # Main content area with enhanced styling
-    st.markdown(f'<div class="category-header">🌍 {selected_category}</div>', unsafe_allow_html=True)
-    
-    # Add a refresh button
-    col1, col2 = st.columns([1, 4])
-    with col1:
-        if st.button("🔄 Refresh News", type="primary"):
-            st.rerun()
+    # Once per session, fetch the other categories in the background so that
+    # switching to them later is served from the cache
+    batch_mode = AGENT_CONFIG.get("batch_mode", False)
+    if AGENT_CONFIG.get("prefetch", True) and not batch_mode and not st.session_state.get("prefetched"):
+        st.session_state.prefetched = True
+        prefetch_categories([
+            prompt
+            for name, prompt in CATEGORY_PROMPTS.items()
+            if name != selected_category
+        ])
     
-    with col2:
-        st.markdown("*Click refresh to get the latest news*")
-    
-    # Get and display news with enhanced loading state
-    with st.spinner(f"🔍 Fetching latest {selected_category.lower()} news..."):
-        news_content = get_news_content(agent, news_categories[selected_category]["prompt"])
-    
-    # Display news content using streamlit.markdown() with custom styling
-    st.markdown(f"""<div class="news-card">
-{news_content}
-</div>""", unsafe_allow_html=True)
-    
-    # Success message
-    st.success("✅ News content loaded successfully!")
+    render_news(selected_category)
     
     # Footer with enhanced styling
     st.markdown("---")
@@ -34,6 +34,10 @@ NEWS_CATEGORIES = {
     }
 }
 
+# Category names in display order, and each category's prompt
+CATEGORY_NAMES = tuple(NEWS_CATEGORIES)
+CATEGORY_PROMPTS = {name: category["prompt"] for name, category in NEWS_CATEGORIES.items()}
+
 # App configuration
 APP_CONFIG = {
     "page_title": "News Reader - Your Personalized News Dashboard",
@@ -46,7 +50,29 @@ APP_CONFIG = {
 AGENT_CONFIG = {
     "model": "gemini-2.5-flash",
     "temperature": 0.2,
-    "max_results": 3
+    "max_results": 3,
+    # "basic" returns short snippets and answers faster than "advanced" (the
+    # tool's default), which extracts longer passages per result
+    "search_depth": "basic",
+    # Seconds an answer is kept in memory before it is looked up again (on disk,
+    # then from the agent)
+    "cache_ttl": 300,
+    # Seconds the page waits for an answer before showing a timeout error
+    "timeout_s": 120,
+    # Seconds an answer is kept in the on-disk cache (.news_cache/, used when
+    # diskcache is installed), which survives server restarts. This bounds how
+    # old a shown answer can be; its age is displayed under the news
+    "disk_cache_ttl": 1800,
+    # Fetch the other categories in the background on first load, with at
+    # most prefetch_workers agent runs at a time (Tavily rate limits)
+    "prefetch": True,
+    "prefetch_workers": 3,
+    # Ask for all categories in one agent run returning a JSON object, instead
+    # of one run per category (fewer LLM round trips, one larger answer)
+    "batch_mode": False,
+    # Have the agent return a typed summary and source list instead of free
+    # text that is parsed heuristically (costs one extra LLM call per answer)
+    "structured_output": False
 }
 
 # Styling configuration
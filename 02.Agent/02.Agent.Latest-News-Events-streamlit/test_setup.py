@@ -3,47 +3,34 @@
 Test script to verify the Streamlit news app setup
 """
 
+import importlib.util
 import sys
 from pathlib import Path
 
-def test_imports():
-    """Test if all required modules can be imported"""
-    print("🔍 Testing imports...")
-    
-    try:
-        import streamlit as st
-        print("✅ Streamlit imported successfully")
-    except ImportError as e:
-        print(f"❌ Streamlit import failed: {e}")
-        return False
-    
-    try:
-        from dotenv import load_dotenv
-        print("✅ python-dotenv imported successfully")
-    except ImportError as e:
-        print(f"❌ python-dotenv import failed: {e}")
-        return False
-    
+def module_available(module_name):
+    """Check that a module can be found, without running its import-time code"""
     try:
-        from langchain_google_genai import ChatGoogleGenerativeAI
-        print("✅ langchain-google-genai imported successfully")
-    except ImportError as e:
-        print(f"❌ langchain-google-genai import failed: {e}")
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
         return False
+
+def test_imports():
+    """Test if all required modules can be found"""
+    print("🔍 Testing imports...")
     
-    try:
-        from langchain_community.tools.tavily_search import TavilySearchResults
-        print("✅ TavilySearchResults imported successfully")
-    except ImportError as e:
-        print(f"❌ TavilySearchResults import failed: {e}")
-        return False
+    modules = [
+        ("streamlit", "Streamlit"),
+        ("dotenv", "python-dotenv"),
+        ("langchain_google_genai", "langchain-google-genai"),
+        ("langchain_community.tools.tavily_search", "TavilySearchResults"),
+        ("langgraph.prebuilt", "create_react_agent"),
+    ]
     
-    try:
-        from langgraph.prebuilt import create_react_agent
-        print("✅ create_react_agent imported successfully")
-    except ImportError as e:
-        print(f"❌ create_react_agent import failed: {e}")
-        return False
+    for module_name, label in modules:
+        if not module_available(module_name):
+            print(f"❌ {label} import failed: no module named '{module_name}'")
+            return False
+        print(f"✅ {label} found")
     
     return True
 
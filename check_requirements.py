@@ -7,19 +7,22 @@ and provides helpful information about missing packages.
 """
 
 import sys
-import importlib
+import importlib.util
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 def check_package(package_name, import_name=None):
-    """Check if a package is installed"""
+    """Check if a package is installed (located, not imported, so no import-time work runs)"""
     if import_name is None:
         import_name = package_name
     
     try:
-        importlib.import_module(import_name)
-        return True, None
-    except ImportError as e:
+        spec = importlib.util.find_spec(import_name)
+    except (ImportError, ValueError) as e:
         return False, str(e)
+    if spec is None:
+        return False, f"No module named '{import_name}'"
+    return True, None
 
 def check_ollama():
     """Check if Ollama is available"""
@@ -52,11 +55,17 @@ def main():
         ("pandas", "pandas"),
     ]
     
+    # The probes are independent: run them (and the `ollama list` call,
+    # which can take seconds) concurrently, then report in the listed order
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        ollama_future = executor.submit(check_ollama)
+        package_results = list(executor.map(lambda p: check_package(*p), core_packages))
+        ollama_ok, ollama_error = ollama_future.result()
+    
     print("\n📦 Checking Python packages:")
     all_good = True
     
-    for package, import_name in core_packages:
-        installed, error = check_package(package, import_name)
+    for (package, import_name), (installed, error) in zip(core_packages, package_results):
         status = "✅" if installed else "❌"
         print(f"  {status} {package}")
         if not installed:
@@ -64,7 +73,6 @@ def main():
             print(f"     Error: {error}")
     
     print("\n🤖 Checking Ollama:")
-    ollama_ok, ollama_error = check_ollama()
     status = "✅" if ollama_ok else "❌"
     print(f"  {status} Ollama")
     if not ollama_ok: